@@ -0,0 +1,78 @@
+OP_CONSTANT = 0
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_POP = 4
+OP_GET_LOCAL = 5
+OP_SET_LOCAL = 6
+OP_GET_GLOBAL = 7
+OP_DEFINE_GLOBAL = 8
+OP_SET_GLOBAL = 9
+OP_GET_UPVALUE = 10
+OP_SET_UPVALUE = 11
+OP_GET_PROPERTY = 12
+OP_SET_PROPERTY = 13
+OP_GET_SUPER = 14
+OP_EQUAL = 15
+OP_NOT_EQUAL = 16
+OP_GREATER = 17
+OP_GREATER_EQUAL = 18
+OP_LESS = 19
+OP_LESS_EQUAL = 20
+OP_ADD = 21
+OP_SUBTRACT = 22
+OP_MULTIPLY = 23
+OP_DIVIDE = 24
+OP_MODULO = 25
+OP_NOT = 26
+OP_NEGATE = 27
+OP_PRINT = 28
+OP_JUMP = 29
+OP_JUMP_IF_FALSE = 30
+OP_JUMP_IF_TRUE = 31
+OP_POP_JUMP_IF_FALSE = 32
+OP_LOOP = 33
+OP_CALL = 34
+OP_INVOKE = 35
+OP_SUPER_INVOKE = 36
+OP_CLOSURE = 37
+OP_CLOSE_UPVALUE = 38
+OP_RETURN = 39
+OP_CLASS = 40
+OP_INHERIT = 41
+OP_METHOD = 42
+OP_TAIL_CALL = 43
+
+class Chunk:
+    def __init__(self):
+        self.code = []
+        self.tokens = []
+        self.constants = []
+        self.constantIndex = {}
+    def write(self, byte, token):
+        self.code.append(byte)
+        self.tokens.append(token)
+    def addConstant(self, value):
+        key = (type(value), value)
+        if type(value) is float and value == 0: key = (float, str(value))
+        try:
+            return self.constantIndex[key]
+        except (KeyError, TypeError):
+            pass
+        self.constants.append(value)
+        index = len(self.constants) - 1
+        try:
+            self.constantIndex[key] = index
+        except TypeError:
+            pass
+        return index
+
+class VMFunction:
+    def __init__(self, name):
+        self.name = name
+        self.arity = 0
+        self.upvalues = []
+        self.chunk = Chunk()
+    def __repr__(self):
+        if self.name == None: return "<script>"
+        return f"<fn {self.name}>"
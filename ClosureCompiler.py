@@ -0,0 +1,532 @@
+from Environment import *
+from LoxFunction import *
+from LoxClass import *
+from Expr import *
+from Stmt import Block
+from TokenType import *
+import operator
+
+class CompiledFunction(LoxFunction):
+    def __init__(self, declaration, closure, isInitialiser, body, boxed=()):
+        super().__init__(declaration, closure, isInitialiser, boxed)
+        self.body = body
+    def call(self, interpreter, arguments):
+        if interpreter.depth >= interpreter.maxDepth: raise RecursionError
+        interpreter.depth += 1
+        try:
+            function = self
+            while True:
+                if function.boxed: function.box(arguments)
+                result = function.body(Environment(function.closure, arguments))
+                if function.isInitialiser: return arguments[0]
+                if result is None: return None
+                if len(result) == 1: return result[0]
+                function, arguments = result[1], result[2]
+                if type(function) is not CompiledFunction: return function.call(interpreter, arguments)
+        finally:
+            interpreter.depth -= 1
+
+class ClosureCompiler:
+    def __init__(self, interpreter, functionType=None):
+        self.interpreter = interpreter
+        self.scopeDepth = 0
+        self.functionType = CompiledFunction if functionType == None else functionType
+    def compile(self, statements):
+        return self.compileBlock(statements)
+    def compileBlock(self, statements):
+        compiled = [statement.accept(self) for statement in statements if statement != None]
+        if len(compiled) == 1:
+            return compiled[0]
+        def block(env):
+            for statement in compiled:
+                result = statement(env)
+                if result != None: return result
+        return block
+    def compileFunction(self, declaration):
+        self.scopeDepth += 1
+        body = self.compileBlock(declaration.body)
+        self.scopeDepth -= 1
+        return body
+    def compileDefine(self, name, value, boxed=False):
+        if self.scopeDepth == 0:
+            cell = self.interpreter.globals.cell(name)
+            def defineGlobal(env):
+                cell.value = value(env)
+            return defineGlobal
+        if boxed:
+            def defineBoxed(env):
+                upvalue = Upvalue(None)
+                env.values.append(upvalue)
+                upvalue.value = value(env)
+            return defineBoxed
+        def defineLocal(env):
+            env.values.append(value(env))
+        return defineLocal
+    def visitBlockStmt(self, stmt):
+        if stmt.location:
+            return self.compileBlock(stmt.statements)
+        self.scopeDepth += 1
+        body = self.compileBlock(stmt.statements)
+        self.scopeDepth -= 1
+        def block(env):
+            return body(Environment(env))
+        return block
+    def visitExpressionStmt(self, stmt):
+        expression = stmt.expression.accept(self)
+        def expressionStmt(env):
+            expression(env)
+        return expressionStmt
+    def visitPrintStmt(self, stmt):
+        expression = stmt.expression.accept(self)
+        stringify = self.interpreter.stringify
+        def printStmt(env):
+            print(stringify(expression(env)))
+        return printStmt
+    def visitVarStmt(self, stmt):
+        if stmt.initialiser == None:
+            def initialiser(env):
+                return None
+        else:
+            initialiser = stmt.initialiser.accept(self)
+        return self.compileDefine(stmt.name.lexeme, initialiser, stmt.location)
+    def visitFunctionStmt(self, stmt):
+        body = self.compileFunction(stmt)
+        closure = self.compileClosure(stmt)
+        boxed, upvalues, boxedSlots = stmt.location
+        makeFunction = self.makeFunction
+        def function(env):
+            return makeFunction(stmt, closure(env), False, body, boxedSlots)
+        return self.compileDefine(stmt.name.lexeme, function, boxed)
+    def makeFunction(self, declaration, closure, isInitialiser, body, boxed):
+        if self.functionType is CompiledFunction:
+            return CompiledFunction(declaration, closure, isInitialiser, body, boxed)
+        return self.functionType(declaration, closure, isInitialiser, boxed)
+    def compileClosure(self, declaration):
+        upvalues = declaration.location[1]
+        if len(upvalues) == 0:
+            def noClosure(env):
+                return None
+            return noClosure
+        if len(upvalues) == 1 and upvalues[0][0] == 0:
+            slot = upvalues[0][1]
+            def localClosure(env):
+                return Environment(None, [env.values[slot]])
+            return localClosure
+        def closure(env):
+            values = []
+            for depth, slot in upvalues:
+                values.append(env.values[slot] if depth == 0 else env.getAt(depth, slot))
+            return Environment(None, values)
+        return closure
+    def visitReturnStmt(self, stmt):
+        if stmt.value == None:
+            def returnStmt(env):
+                return (None,)
+            return returnStmt
+        if type(stmt.value) == Call and type(stmt.value.callee) != Get and type(stmt.value.callee) != Super:
+            return self.compileTailCall(stmt.value)
+        value = stmt.value.accept(self)
+        def returnStmt(env):
+            return (value(env),)
+        return returnStmt
+    def compileTailCall(self, expr):
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        interpreter = self.interpreter
+        functionType = self.functionType
+        paren = expr.paren
+        argCount = len(arguments)
+        def tailCall(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+            if type(function) is functionType and argCount == function.arity:
+                return (None, function, values)
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            if argCount != function.arity:
+                raise LoxRuntimeError(paren, f"Expected {function.arity} arguments but got {argCount}.")
+            try:
+                return (function.call(interpreter, values),)
+            except RecursionError:
+                raise LoxRuntimeError(paren, "Stack overflow.")
+        return tailCall
+    def visitIfStmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        thenBranch = stmt.thenBranch.accept(self)
+        if stmt.elseBranch == None:
+            def ifStmt(env):
+                value = condition(env)
+                if value is not None and value != 0:
+                    return thenBranch(env)
+            return ifStmt
+        elseBranch = stmt.elseBranch.accept(self)
+        def ifElseStmt(env):
+            value = condition(env)
+            if value is not None and value != 0:
+                return thenBranch(env)
+            return elseBranch(env)
+        return ifElseStmt
+    def visitWhileStmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        frame = self.interpreter.loopFrame(stmt.body)
+        if frame is not None:
+            return self.compileFrameLoop(condition, frame[0], frame[1])
+        body = stmt.body.accept(self)
+        def whileStmt(env):
+            while True:
+                value = condition(env)
+                if value is None or value == 0: return None
+                result = body(env)
+                if result != None: return result
+        return whileStmt
+    def compileFrameLoop(self, condition, statements, rest):
+        self.scopeDepth += 1
+        body = self.compileBlock(statements)
+        self.scopeDepth -= 1
+        if len(rest) == 0:
+            def frameLoop(env):
+                frame = Environment(env)
+                values = frame.values
+                while True:
+                    value = condition(env)
+                    if value is None or value == 0: return None
+                    values.clear()
+                    result = body(frame)
+                    if result != None: return result
+            return frameLoop
+        after = self.compileBlock(rest)
+        def frameLoopAfter(env):
+            frame = Environment(env)
+            values = frame.values
+            while True:
+                value = condition(env)
+                if value is None or value == 0: return None
+                values.clear()
+                result = body(frame)
+                if result != None: return result
+                after(env)
+        return frameLoopAfter
+    def visitClassStmt(self, stmt):
+        name = stmt.name.lexeme
+        superclassExpr = None
+        if stmt.superclass != None:
+            superclassExpr = stmt.superclass.accept(self)
+        self.scopeDepth += 1
+        methods = [(method, method.name.lexeme == "init", self.compileFunction(method), self.compileClosure(method), method.location[2]) for method in stmt.methods]
+        self.scopeDepth -= 1
+        makeFunction = self.makeFunction
+        def classValue(env):
+            superclass = None
+            if superclassExpr != None:
+                superclass = superclassExpr(env)
+                if type(superclass) != LoxClass:
+                    raise LoxRuntimeError(stmt.superclass.name, "Superclass must be a class.")
+            scope = env
+            if superclass != None:
+                scope = Environment(env, [superclass])
+            table = {}
+            for method, isInitialiser, body, closure, boxedSlots in methods:
+                table[method.name.lexeme] = makeFunction(method, closure(scope), isInitialiser, body, boxedSlots)
+            return LoxClass(name, superclass, table)
+        return self.compileDefine(name, classValue, stmt.location)
+    def visitLiteralExpr(self, expr):
+        value = expr.value
+        def literal(env):
+            return value
+        return literal
+    def visitGroupingExpr(self, expr):
+        return expr.expression.accept(self)
+    def visitVariableExpr(self, expr):
+        return self.compileLookup(expr, expr.name)
+    def visitThisExpr(self, expr):
+        return self.compileLookup(expr, expr.keyword)
+    def compileLookup(self, expr, token):
+        name = token.lexeme
+        location = expr.location
+        if location == None:
+            cell = self.interpreter.globals.cell(name)
+            def globalVariable(env):
+                value = cell.value
+                if value is UNDEFINED:
+                    raise LoxRuntimeError(token, f"Undefined variable '{name}'.")
+                return value
+            return globalVariable
+        distance, slot, boxed = location
+        if boxed:
+            if distance == 0:
+                def localUpvalue(env):
+                    return env.values[slot].value
+                return localUpvalue
+            if distance == 1:
+                def capturedUpvalue(env):
+                    return env.enclosing.values[slot].value
+                return capturedUpvalue
+            def ancestorUpvalue(env):
+                return env.ancestor(distance).values[slot].value
+            return ancestorUpvalue
+        if distance == 0:
+            def localVariable(env):
+                return env.values[slot]
+            return localVariable
+        if distance == 1:
+            def enclosingVariable(env):
+                return env.enclosing.values[slot]
+            return enclosingVariable
+        def ancestorVariable(env):
+            return env.ancestor(distance).values[slot]
+        return ancestorVariable
+    def visitAssignExpr(self, expr):
+        name = expr.name.lexeme
+        value = expr.value.accept(self)
+        location = expr.location
+        if location == None:
+            cell = self.interpreter.globals.cell(name)
+            def assignGlobal(env):
+                result = value(env)
+                if cell.value is UNDEFINED:
+                    raise LoxRuntimeError(expr.name, f"Undefined variable '{name}'.")
+                cell.value = result
+                return result
+            return assignGlobal
+        distance, slot, boxed = location
+        if boxed:
+            def assignUpvalue(env):
+                result = value(env)
+                env.ancestor(distance).values[slot].value = result
+                return result
+            return assignUpvalue
+        if distance == 0:
+            def assignLocal(env):
+                result = value(env)
+                env.values[slot] = result
+                return result
+            return assignLocal
+        def assignAncestor(env):
+            result = value(env)
+            env.ancestor(distance).values[slot] = result
+            return result
+        return assignAncestor
+    def visitLogicalExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if expr.operator.type == TokenType.OR:
+            def logicalOr(env):
+                value = left(env)
+                if value is not None and value != 0: return value
+                return right(env)
+            return logicalOr
+        def logicalAnd(env):
+            value = left(env)
+            if value is None or value == 0: return value
+            return right(env)
+        return logicalAnd
+    def visitUnaryExpr(self, expr):
+        right = expr.right.accept(self)
+        operator = expr.operator
+        if operator.type == TokenType.MINUS:
+            def negate(env):
+                value = right(env)
+                if type(value) is not float:
+                    raise LoxRuntimeError(operator, "Operand should be a number.")
+                return -value
+            return negate
+        def bang(env):
+            value = right(env)
+            return value is None or value == 0
+        return bang
+    def visitBinaryExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        operator = expr.operator
+        if operator.type == TokenType.PLUS:
+            def add(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is float and type(b) is float: return a + b
+                if type(a) is str and type(b) is str: return a + b
+                raise LoxRuntimeError(operator, "Operands must be two numbers or two strigns.")
+            return add
+        if operator.type == TokenType.EQUAL_EQUAL:
+            def equal(env):
+                return left(env) == right(env)
+            return equal
+        if operator.type == TokenType.BANG_EQUAL:
+            def notEqual(env):
+                return left(env) != right(env)
+            return notEqual
+        if operator.type == TokenType.SLASH:
+            def divide(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+                if b == 0:
+                    raise LoxRuntimeError(operator, "You can't divide by 0")
+                return a / b
+            return divide
+        constantRight = type(expr.right) == Literal and type(expr.right.value) is float
+        if operator.type == TokenType.MODULO and not (constantRight and expr.right.value != 0):
+            def modulo(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+                if b == 0:
+                    raise LoxRuntimeError(operator, "You can't divide by 0")
+                return a % b
+            return modulo
+        operation = numberOperations[operator.type]
+        if constantRight:
+            constant = expr.right.value
+            def numberConstantBinary(env):
+                a = left(env)
+                if type(a) is not float:
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+                return operation(a, constant)
+            return numberConstantBinary
+        def numberBinary(env):
+            a = left(env)
+            b = right(env)
+            if type(a) is not float or type(b) is not float:
+                raise LoxRuntimeError(operator, "Operands must be numbers.")
+            return operation(a, b)
+        return numberBinary
+    visitGenericBinaryExpr = visitBinaryExpr
+    visitNumberAddExpr = visitStringAddExpr = visitBinaryExpr
+    visitNumberSubtractExpr = visitNumberMultiplyExpr = visitNumberDivideExpr = visitNumberModuloExpr = visitBinaryExpr
+    visitNumberGreaterExpr = visitNumberGreaterEqualExpr = visitNumberLessExpr = visitNumberLessEqualExpr = visitBinaryExpr
+    visitEqualExpr = visitNotEqualExpr = visitBinaryExpr
+    def visitCallExpr(self, expr):
+        if type(expr.callee) == Get:
+            return self.compileInvoke(expr, self.compileMethodLookup(expr.callee))
+        if type(expr.callee) == Super:
+            return self.compileInvoke(expr, self.compileSuperLookup(expr.callee))
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        interpreter = self.interpreter
+        paren = expr.paren
+        argCount = len(arguments)
+        def call(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            if argCount != function.arity:
+                raise LoxRuntimeError(paren, f"Expected {function.arity} arguments but got {argCount}.")
+            try:
+                return function.call(interpreter, values)
+            except RecursionError:
+                raise LoxRuntimeError(paren, "Stack overflow.")
+        return call
+    def compileInvoke(self, expr, lookup):
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        interpreter = self.interpreter
+        paren = expr.paren
+        argCount = len(arguments)
+        def invoke(env):
+            receiver, function = lookup(env)
+            if receiver is None:
+                values = [argument(env) for argument in arguments]
+                if not isinstance(function, LoxCallable):
+                    raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            else:
+                values = [receiver]
+                values.extend([argument(env) for argument in arguments])
+            if argCount != function.arity:
+                raise LoxRuntimeError(paren, f"Expected {function.arity} arguments but got {argCount}.")
+            try:
+                return function.call(interpreter, values)
+            except RecursionError:
+                raise LoxRuntimeError(paren, "Stack overflow.")
+        return invoke
+    def compileMethodLookup(self, expr):
+        object = expr.object.accept(self)
+        token = expr.name
+        name = token.lexeme
+        cache = self.interpreter.inlineCache("invoke", token)
+        def methodLookup(env):
+            instance = object(env)
+            if type(instance) != LoxInstance:
+                raise LoxRuntimeError(token, "Only instances have properties.")
+            shape = instance.shape
+            if shape is cache.shape:
+                slot, method = cache.entry
+            else:
+                slot, method = cache.lookup(shape)
+            if slot is not None:
+                return None, instance.values[slot]
+            if method == None:
+                raise LoxRuntimeError(token, f"Undefined property '{name}'.")
+            return instance, method
+        return methodLookup
+    def visitGetExpr(self, expr):
+        object = expr.object.accept(self)
+        token = expr.name
+        name = token.lexeme
+        cache = self.interpreter.inlineCache("get", token)
+        def get(env):
+            instance = object(env)
+            if type(instance) != LoxInstance:
+                raise LoxRuntimeError(token, "Only instances have properties.")
+            shape = instance.shape
+            if shape is cache.shape:
+                slot, method = cache.entry
+            else:
+                slot, method = cache.lookup(shape)
+            if slot is not None:
+                return instance.values[slot]
+            if method == None:
+                raise LoxRuntimeError(token, f"Undefined property '{name}'.")
+            return method.bind(instance)
+        return get
+    def visitSetExpr(self, expr):
+        object = expr.object.accept(self)
+        value = expr.value.accept(self)
+        name = expr.name
+        cache = self.interpreter.inlineCache("set", name)
+        def set(env):
+            instance = object(env)
+            if type(instance) != LoxInstance:
+                raise LoxRuntimeError(name, "Only instances have fields.")
+            result = value(env)
+            shape = instance.shape
+            if shape is cache.shape:
+                slot, transition = cache.entry
+            else:
+                slot, transition = cache.lookup(shape)
+            if transition is None:
+                instance.values[slot] = result
+            else:
+                instance.shape = transition
+                instance.values.append(result)
+            return result
+        return set
+    def visitSuperExpr(self, expr):
+        lookup = self.compileSuperLookup(expr)
+        def superExpr(env):
+            instance, method = lookup(env)
+            return method.bind(instance)
+        return superExpr
+    def compileSuperLookup(self, expr):
+        distance, slot, boxed, thisDistance, thisSlot, thisBoxed = expr.location
+        method = expr.method
+        def superLookup(env):
+            superclass = env.ancestor(distance).values[slot]
+            if boxed: superclass = superclass.value
+            instance = env.ancestor(thisDistance).values[thisSlot]
+            if thisBoxed: instance = instance.value
+            function = superclass.findMethod(method.lexeme)
+            if function == None:
+                raise LoxRuntimeError(method, f"Undefined property '{method.lexeme}'.")
+            return instance, function
+        return superLookup
+
+numberOperations = {
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.MODULO: operator.mod,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
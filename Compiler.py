@@ -0,0 +1,306 @@
+from Chunk import *
+from Expr import *
+from TokenType import *
+from Token import Token
+
+class Local:
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.isCaptured = False
+
+class FunctionState:
+    def __init__(self, enclosing, function, type):
+        self.enclosing = enclosing
+        self.function = function
+        self.type = type
+        self.upvalues = []
+        self.scopeDepth = 0
+        if type == "METHOD" or type == "INITIALISER":
+            self.locals = [Local("this", 0)]
+        else:
+            self.locals = [Local("", 0)]
+
+class ClassState:
+    def __init__(self, enclosing):
+        self.enclosing = enclosing
+        self.hasSuperclass = False
+
+class Compiler:
+    def __init__(self, lox):
+        self.lox = lox
+        self.current = None
+        self.currentClass = None
+        self.token = None
+    def compile(self, statements):
+        self.current = FunctionState(None, VMFunction(None), "SCRIPT")
+        for statement in statements:
+            statement.accept(self)
+        self.emitReturn()
+        return self.current.function
+    def visitBlockStmt(self, stmt):
+        self.beginScope()
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.endScope()
+    def visitVarStmt(self, stmt):
+        self.token = stmt.name
+        self.declareVariable(stmt.name)
+        if stmt.initialiser != None:
+            stmt.initialiser.accept(self)
+        else:
+            self.emit(OP_NIL)
+        self.defineVariable(stmt.name)
+    def visitFunctionStmt(self, stmt):
+        self.token = stmt.name
+        self.declareVariable(stmt.name)
+        self.markInitialised()
+        self.function(stmt, "FUNCTION")
+        self.defineVariable(stmt.name)
+    def visitClassStmt(self, stmt):
+        self.token = stmt.name
+        nameConstant = self.identifierConstant(stmt.name)
+        self.declareVariable(stmt.name)
+        self.emit(OP_CLASS, nameConstant)
+        self.defineVariable(stmt.name)
+        self.currentClass = ClassState(self.currentClass)
+        if stmt.superclass != None:
+            stmt.superclass.accept(self)
+            self.beginScope()
+            self.addLocal("super")
+            self.markInitialised()
+            self.namedVariable(stmt.name)
+            self.token = stmt.superclass.name
+            self.emit(OP_INHERIT)
+            self.currentClass.hasSuperclass = True
+        self.namedVariable(stmt.name)
+        for method in stmt.methods:
+            self.token = method.name
+            type = "INITIALISER" if method.name.lexeme == "init" else "METHOD"
+            self.function(method, type)
+            self.emit(OP_METHOD, self.identifierConstant(method.name))
+        self.emit(OP_POP)
+        if self.currentClass.hasSuperclass:
+            self.endScope()
+        self.currentClass = self.currentClass.enclosing
+    def visitExpressionStmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(OP_POP)
+    def visitPrintStmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(OP_PRINT)
+    def visitReturnStmt(self, stmt):
+        self.token = stmt.keyword
+        if stmt.value == None:
+            self.emitReturn()
+        elif type(stmt.value) == Call and type(stmt.value.callee) not in (Get, Super) and self.current.type != "INITIALISER":
+            call = stmt.value
+            call.callee.accept(self)
+            self.arguments(call.arguments)
+            self.token = call.paren
+            self.emit(OP_TAIL_CALL, len(call.arguments))
+            self.emit(OP_RETURN)
+        else:
+            stmt.value.accept(self)
+            self.emit(OP_RETURN)
+    def visitIfStmt(self, stmt):
+        stmt.condition.accept(self)
+        elseJump = self.emitJump(OP_POP_JUMP_IF_FALSE)
+        stmt.thenBranch.accept(self)
+        if stmt.elseBranch != None:
+            endJump = self.emitJump(OP_JUMP)
+            self.patchJump(elseJump)
+            stmt.elseBranch.accept(self)
+            self.patchJump(endJump)
+        else:
+            self.patchJump(elseJump)
+    def visitWhileStmt(self, stmt):
+        loopStart = len(self.currentChunk().code)
+        stmt.condition.accept(self)
+        exitJump = self.emitJump(OP_POP_JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        self.emitLoop(loopStart)
+        self.patchJump(exitJump)
+    def visitAssignExpr(self, expr):
+        expr.value.accept(self)
+        self.token = expr.name
+        self.namedVariable(expr.name, True)
+    def visitBinaryExpr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        self.token = expr.operator
+        self.emit(binaryOps[expr.operator.type])
+    def visitCallExpr(self, expr):
+        callee = expr.callee
+        if type(callee) == Get:
+            callee.object.accept(self)
+            self.arguments(expr.arguments)
+            self.token = expr.paren
+            self.emit(OP_INVOKE, self.identifierConstant(callee.name), len(expr.arguments))
+        elif type(callee) == Super:
+            self.namedVariable(Token(TokenType.THIS, "this", None, callee.keyword.line))
+            self.arguments(expr.arguments)
+            self.namedVariable(callee.keyword)
+            self.token = expr.paren
+            self.emit(OP_SUPER_INVOKE, self.identifierConstant(callee.method), len(expr.arguments))
+        else:
+            callee.accept(self)
+            self.arguments(expr.arguments)
+            self.token = expr.paren
+            self.emit(OP_CALL, len(expr.arguments))
+    def arguments(self, arguments):
+        for argument in arguments:
+            argument.accept(self)
+    def visitGetExpr(self, expr):
+        expr.object.accept(self)
+        self.token = expr.name
+        self.emit(OP_GET_PROPERTY, self.identifierConstant(expr.name))
+    def visitSetExpr(self, expr):
+        expr.object.accept(self)
+        expr.value.accept(self)
+        self.token = expr.name
+        self.emit(OP_SET_PROPERTY, self.identifierConstant(expr.name))
+    def visitGroupingExpr(self, expr):
+        expr.expression.accept(self)
+    def visitLiteralExpr(self, expr):
+        if expr.value == None: self.emit(OP_NIL)
+        elif expr.value is True: self.emit(OP_TRUE)
+        elif expr.value is False: self.emit(OP_FALSE)
+        else: self.emit(OP_CONSTANT, self.currentChunk().addConstant(expr.value))
+    def visitLogicalExpr(self, expr):
+        expr.left.accept(self)
+        if expr.operator.type == TokenType.OR:
+            endJump = self.emitJump(OP_JUMP_IF_TRUE)
+        else:
+            endJump = self.emitJump(OP_JUMP_IF_FALSE)
+        self.emit(OP_POP)
+        expr.right.accept(self)
+        self.patchJump(endJump)
+    def visitSuperExpr(self, expr):
+        self.namedVariable(Token(TokenType.THIS, "this", None, expr.keyword.line))
+        self.namedVariable(expr.keyword)
+        self.token = expr.method
+        self.emit(OP_GET_SUPER, self.identifierConstant(expr.method))
+    def visitThisExpr(self, expr):
+        self.namedVariable(expr.keyword)
+    def visitUnaryExpr(self, expr):
+        expr.right.accept(self)
+        self.token = expr.operator
+        if expr.operator.type == TokenType.MINUS:
+            self.emit(OP_NEGATE)
+        else:
+            self.emit(OP_NOT)
+    def visitVariableExpr(self, expr):
+        self.token = expr.name
+        self.namedVariable(expr.name)
+    def function(self, stmt, type):
+        function = VMFunction(stmt.name.lexeme)
+        function.arity = len(stmt.params)
+        self.current = FunctionState(self.current, function, type)
+        self.beginScope()
+        for param in stmt.params:
+            self.declareVariable(param)
+            self.markInitialised()
+        for statement in stmt.body:
+            statement.accept(self)
+        self.emitReturn()
+        state = self.current
+        self.current = state.enclosing
+        function.upvalues = state.upvalues
+        self.token = stmt.name
+        self.emit(OP_CLOSURE, self.currentChunk().addConstant(function))
+    def namedVariable(self, name, assign=False):
+        arg = self.resolveLocal(self.current, name.lexeme)
+        if arg != -1:
+            getOp, setOp = OP_GET_LOCAL, OP_SET_LOCAL
+        else:
+            arg = self.resolveUpvalue(self.current, name.lexeme)
+            if arg != -1:
+                getOp, setOp = OP_GET_UPVALUE, OP_SET_UPVALUE
+            else:
+                arg = self.identifierConstant(name)
+                getOp, setOp = OP_GET_GLOBAL, OP_SET_GLOBAL
+        self.emit(setOp if assign else getOp, arg)
+    def resolveLocal(self, state, name):
+        for i in range(len(state.locals)-1, -1, -1):
+            local = state.locals[i]
+            if local.name == name and local.depth != -1:
+                return i
+        return -1
+    def resolveUpvalue(self, state, name):
+        if state.enclosing == None: return -1
+        local = self.resolveLocal(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].isCaptured = True
+            return self.addUpvalue(state, local, True)
+        upvalue = self.resolveUpvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.addUpvalue(state, upvalue, False)
+        return -1
+    def addUpvalue(self, state, index, isLocal):
+        for i, upvalue in enumerate(state.upvalues):
+            if upvalue == (isLocal, index): return i
+        state.upvalues.append((isLocal, index))
+        return len(state.upvalues) - 1
+    def identifierConstant(self, name):
+        return self.currentChunk().addConstant(name.lexeme)
+    def declareVariable(self, name):
+        if self.current.scopeDepth == 0: return
+        self.addLocal(name.lexeme)
+    def addLocal(self, name):
+        self.current.locals.append(Local(name, -1))
+    def markInitialised(self):
+        if self.current.scopeDepth == 0: return
+        self.current.locals[-1].depth = self.current.scopeDepth
+    def defineVariable(self, name):
+        if self.current.scopeDepth > 0:
+            self.markInitialised()
+            return
+        self.emit(OP_DEFINE_GLOBAL, self.identifierConstant(name))
+    def beginScope(self):
+        self.current.scopeDepth += 1
+    def endScope(self):
+        state = self.current
+        state.scopeDepth -= 1
+        while len(state.locals) > 0 and state.locals[-1].depth > state.scopeDepth:
+            if state.locals[-1].isCaptured:
+                self.emit(OP_CLOSE_UPVALUE)
+            else:
+                self.emit(OP_POP)
+            state.locals.pop()
+    def currentChunk(self):
+        return self.current.function.chunk
+    def emit(self, *bytes):
+        chunk = self.currentChunk()
+        for byte in bytes:
+            chunk.write(byte, self.token)
+    def emitReturn(self):
+        if self.current.type == "INITIALISER":
+            self.emit(OP_GET_LOCAL, 0)
+        else:
+            self.emit(OP_NIL)
+        self.emit(OP_RETURN)
+    def emitJump(self, op):
+        self.emit(op, 0)
+        return len(self.currentChunk().code) - 1
+    def patchJump(self, offset):
+        code = self.currentChunk().code
+        code[offset] = len(code) - offset
+    def emitLoop(self, loopStart):
+        self.emit(OP_LOOP, 0)
+        code = self.currentChunk().code
+        code[-1] = len(code) - 1 - loopStart
+
+binaryOps = {
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.STAR: OP_MULTIPLY,
+    TokenType.SLASH: OP_DIVIDE,
+    TokenType.MODULO: OP_MODULO,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+}
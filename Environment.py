@@ -1,38 +1,42 @@
 from LoxRuntimeError import *
 
 class Environment:
-    def __init__(self, *args):
-        if len(args) > 0:
-            self.enclosing = args[0]
-        else:
-            self.enclosing = None
-        self.values = {}
+    def __init__(self, enclosing=None, values=None):
+        self.enclosing = enclosing
+        if values == None:
+            values = []
+        self.values = values
     def define(self, name, value):
-        self.values[name] = value
+        self.values.append(value)
     def ancestor(self, distance):
         environment = self
         for i in range(distance):
             environment = environment.enclosing
         return environment
-    def get(self, name):
-        if name.lexeme in self.values.keys():
-            return self.values[name.lexeme]
-        elif self.enclosing != None:
-            return self.enclosing.get(name)
-        raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
-    def getAt(self, distance, name):
-        return self.ancestor(distance).values[name]
-    def assignAt(self, distance, name, value):
-        self.ancestor(distance).values[name.lexeme] = value
-    def assign(self, name, value):
-        #print(f"Assigning value {str(value)} to variable {name}")
-        if name.lexeme in self.values.keys():
-            #print("found")
-            self.values[name.lexeme] = value
-            #print(self.values[name.lexeme])
-            return
-        elif self.enclosing != None:
-            self.enclosing.assign(name, value)
-            return
-        #print(self.values[name.lexeme])
-        raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+    def getAt(self, distance, slot):
+        return self.ancestor(distance).values[slot]
+    def assignAt(self, distance, slot, value):
+        self.ancestor(distance).values[slot] = value
+
+class Upvalue:
+    __slots__ = ("value",)
+    def __init__(self, value):
+        self.value = value
+
+class GlobalCell:
+    def __init__(self):
+        self.value = UNDEFINED
+
+class GlobalEnvironment:
+    def __init__(self):
+        self.enclosing = None
+        self.cells = {}
+    def cell(self, name):
+        cell = self.cells.get(name)
+        if cell == None:
+            cell = self.cells.setdefault(name, GlobalCell())
+        return cell
+    def define(self, name, value):
+        self.cell(name).value = value
+
+UNDEFINED = object()
@@ -1,10 +1,14 @@
 class Assign:
+    __slots__ = ("name", "value", "cell", "location")
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.cell = None
+        self.location = None
     def accept(self, visitor):
         return visitor.visitAssignExpr(self)
 class Binary:
+    __slots__ = ("left", "operator", "right")
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -12,29 +16,36 @@ class Binary:
     def accept(self, visitor):
         return visitor.visitBinaryExpr(self)
 class Call:
+    __slots__ = ("callee", "paren", "arguments", "cache")
     def __init__(self, callee, paren, arguments):
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
+        self.cache = None
     def accept(self, visitor):
         return visitor.visitCallExpr(self)
 class Get:
+    __slots__ = ("object", "name", "cache")
     def __init__(self, object, name):
         self.object = object
         self.name = name
+        self.cache = None
     def accept(self, visitor):
         return visitor.visitGetExpr(self)
 class Grouping:
+    __slots__ = ("expression",)
     def __init__(self, expression):
         self.expression = expression
     def accept(self, visitor):
         return visitor.visitGroupingExpr(self)
 class Literal:
+    __slots__ = ("value",)
     def __init__(self, value):
         self.value = value
     def accept(self, visitor):
         return visitor.visitLiteralExpr(self)
 class Logical:
+    __slots__ = ("left", "operator", "right")
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -42,31 +53,41 @@ class Logical:
     def accept(self, visitor):
         return visitor.visitLogicalExpr(self)
 class Set:
+    __slots__ = ("object", "name", "value", "cache")
     def __init__(self, object, name, value):
         self.object = object
         self.name = name
         self.value = value
+        self.cache = None
     def accept(self, visitor):
         return visitor.visitSetExpr(self)
 class Super:
+    __slots__ = ("keyword", "method", "location")
     def __init__(self, keyword, method):
         self.keyword = keyword
         self.method = method
+        self.location = None
     def accept(self, visitor):
         return visitor.visitSuperExpr(self)
 class This:
+    __slots__ = ("keyword", "location")
     def __init__(self, keyword):
         self.keyword = keyword
+        self.location = None
     def accept(self, visitor):
         return visitor.visitThisExpr(self)
 class Unary:
+    __slots__ = ("operator", "right")
     def __init__(self, operator, right):
         self.operator = operator
         self.right = right
     def accept(self, visitor):
         return visitor.visitUnaryExpr(self)
 class Variable:
+    __slots__ = ("name", "cell", "location")
     def __init__(self, name):
         self.name = name
+        self.cell = None
+        self.location = None
     def accept(self, visitor):
         return visitor.visitVariableExpr(self)
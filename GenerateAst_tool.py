@@ -8,28 +8,28 @@ class GenerateAst:
         outputDir = sys.argv[1]
         #outputDir = ""
         self.defineAst(outputDir, "Expr", [
-        "Assign   : name, value",
+        "Assign   : name, value | cell, location",
         "Binary   : left, operator, right",
-        "Call     : callee, paren, arguments",
-        "Get      : object, name",
+        "Call     : callee, paren, arguments | cache",
+        "Get      : object, name | cache",
         "Grouping : expression",
         "Literal  : value",
         "Logical  : left, operator, right",
-        "Set      : object, name, value",
-        "Super    : keyword, method",
-        "This     : keyword",
+        "Set      : object, name, value | cache",
+        "Super    : keyword, method | location",
+        "This     : keyword | location",
         "Unary    : operator, right",
-        "Variable : name"
+        "Variable : name | cell, location"
         ])
         self.defineAst(outputDir, "Stmt", [
-        "Block      : statements",
-        "Class      : name, superclass, methods",
+        "Block      : statements | location",
+        "Class      : name, superclass, methods | location",
         "Expression : expression",
-        "Function   : name, params, body",
+        "Function   : name, params, body | tier, location",
         "If         : condition, thenBranch, elseBranch",
-        "Print      : expression",
+        "Print      : keyword, expression",
         "Return     : keyword, value",
-        "Var        : name, initialiser",
+        "Var        : name, initialiser | location",
         "While      : condition, body"
         ])
     def defineAst(self, outputDir, baseName, types):
@@ -39,21 +39,28 @@ class GenerateAst:
         textToWrite = ''
         for type in types:
             className = type.split(':')[0].strip()
-            fields = type.split(':')[1].strip()
-            textToWrite += self.defineType(baseName, className, fields)
+            fields = type.split(':')[1].split('|')[0].strip()
+            caches = []
+            if '|' in type:
+                caches = type.split('|')[1].strip().split(', ')
+            textToWrite += self.defineType(baseName, className, fields, caches)
             textToWrite += f"""    def accept(self, visitor):
         return visitor.visit{className}{baseName}(self)
 """
         #print(textToWrite)
         with open(path, 'w') as file:
             file.write(textToWrite)
-    def defineType(self, baseName, className, fieldList):
+    def defineType(self, baseName, className, fieldList, caches):
+        fields = fieldList.split(', ')
+        slots = ", ".join(f'"{field}"' for field in fields + caches)
         text = f"""class {className}:
+    __slots__ = ({slots}{',' if len(fields + caches) == 1 else ''})
     def __init__(self, {fieldList}):
 """
-        fields = fieldList.split(', ')
         for field in fields:
             text += f"        self.{field} = {field}\n"
+        for cache in caches:
+            text += f"        self.{cache} = None\n"
         #print(text)
         return text
     def defineExpr(self, baseName, types):
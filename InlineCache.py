@@ -0,0 +1,43 @@
+POLYMORPHIC_LIMIT = 4
+
+class InlineCache:
+    def __init__(self, kind, token, counting):
+        self.kind = kind
+        self.counting = counting
+        self.token = token
+        self.name = token.lexeme
+        self.shape = None
+        self.entry = None
+        self.entries = {}
+        self.megamorphic = False
+        self.hits = 0
+        self.misses = 0
+    def lookup(self, shape):
+        if shape in self.entries:
+            self.hits += 1
+            entry = self.entries[shape]
+        else:
+            self.misses += 1
+            entry = self.resolve(shape)
+            if len(self.entries) < POLYMORPHIC_LIMIT:
+                self.entries[shape] = entry
+            else:
+                self.megamorphic = True
+        if not self.counting:
+            self.shape = shape
+            self.entry = entry
+        return entry
+    def resolve(self, shape):
+        slot = shape.slots.get(self.name)
+        if self.kind == "set":
+            if slot != None: return (slot, None)
+            return (None, shape.withField(self.name))
+        if slot != None: return (slot, None)
+        return (None, shape.klass.findMethod(self.name))
+    def state(self):
+        if self.megamorphic: return "megamorphic"
+        if len(self.entries) > 1: return "polymorphic"
+        if len(self.entries) == 1: return "monomorphic"
+        return "uninitialised"
+    def __repr__(self):
+        return f"[line {self.token.line}] {self.kind} .{self.name}: {self.hits} hits, {self.misses} misses, {self.state()}"
@@ -0,0 +1,99 @@
+from Optimizer import *
+
+MAX_NODES = 16
+
+class Inliner(Optimizer):
+    def __init__(self):
+        self.candidates = {}
+        self.defined = set()
+        self.inlined = 0
+        self.expanding = set()
+    def inline(self, statements):
+        self.candidates = self.findCandidates(statements)
+        optimized = []
+        for statement in statements:
+            declared = statement.name.lexeme if type(statement) in (Var, Function, Class) else None
+            statement = statement.accept(self)
+            if statement is not None: optimized.append(statement)
+            if declared != None: self.defined.add(declared)
+        return optimized
+    def findCandidates(self, statements):
+        declarations = {}
+        localNames = set()
+        nodes = []
+        for statement in statements:
+            if type(statement) in (Var, Function, Class):
+                declarations[statement.name.lexeme] = declarations.get(statement.name.lexeme, 0) + 1
+            for node in self.walk(statement):
+                nodes.append(node)
+                if node is not statement and type(node) in (Var, Function, Class):
+                    localNames.add(node.name.lexeme)
+                if type(node) == Function:
+                    localNames.update(param.lexeme for param in node.params)
+        callees = set(id(node.callee) for node in nodes if type(node) == Call)
+        candidates = {}
+        for statement in statements:
+            if type(statement) == Function and declarations[statement.name.lexeme] == 1:
+                body = self.inlineBody(statement, localNames)
+                if body != None: candidates[statement.name.lexeme] = (statement, body)
+        for node in nodes:
+            if type(node) in (Variable, Assign) and node.location == None and node.name.lexeme in candidates:
+                if type(node) == Assign or id(node) not in callees:
+                    del candidates[node.name.lexeme]
+        return candidates
+    def inlineBody(self, function, localNames):
+        if len(function.body) == 0:
+            return Literal(None)
+        if len(function.body) != 1 or type(function.body[0]) != Return:
+            return None
+        if function.body[0].value == None:
+            return Literal(None)
+        body = function.body[0].value
+        nodes = list(self.walk(body))
+        if len(nodes) > MAX_NODES: return None
+        for node in nodes:
+            if type(node) in (Assign, This, Super): return None
+            if type(node) == Variable and node.location == None:
+                if node.name.lexeme == function.name.lexeme or node.name.lexeme in localNames: return None
+        return body
+    def walk(self, node):
+        yield node
+        for field in type(node).__slots__:
+            value = getattr(node, field)
+            if type(value) == list:
+                for item in value:
+                    if hasattr(item, "accept"): yield from self.walk(item)
+            elif hasattr(value, "accept"):
+                yield from self.walk(value)
+    def isPure(self, expr, callsInBody):
+        if type(expr) in (Literal, This): return True
+        if callsInBody or type(expr) != Variable: return False
+        return expr.location != None or expr.name.lexeme in self.defined
+    def visitCallExpr(self, expr):
+        expr = super().visitCallExpr(expr)
+        callee = expr.callee
+        if type(callee) != Variable or callee.location != None or callee.name.lexeme not in self.defined:
+            return expr
+        candidate = self.candidates.get(callee.name.lexeme)
+        if candidate == None: return expr
+        function, body = candidate
+        if function in self.expanding or len(expr.arguments) != len(function.params): return expr
+        callsInBody = any(type(node) == Call for node in self.walk(body))
+        for argument in expr.arguments:
+            if not self.isPure(argument, callsInBody): return expr
+        self.inlined += 1
+        self.expanding.add(function)
+        try:
+            return self.copy(body, expr.arguments).accept(self)
+        finally:
+            self.expanding.remove(function)
+    def copy(self, value, arguments):
+        if type(value) == list:
+            return [self.copy(item, arguments) for item in value]
+        if not hasattr(value, "accept"):
+            return value
+        if type(value) == Variable and value.location != None:
+            return arguments[value.location[1]]
+        kind = type(value)
+        code = kind.__init__.__code__
+        return kind(*[self.copy(getattr(value, field), arguments) for field in code.co_varnames[1:code.co_argcount]])
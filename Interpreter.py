@@ -2,165 +2,301 @@ from LoxRuntimeError import *
 from Environment import *
 from LoxCallable import *
 from LoxFunction import *
-from Return import *
 from LoxClass import *
+from InlineCache import *
+from Operators import *
+from SpecializedExpr import *
+from Expr import Call, Get, Super
+from Stmt import Block
 import time
 
+FRAMES_MAX = 1024
+
 class Clock(LoxCallable):
-    def arity(self): return 0
+    arity = 0
     def call(self, interpeter, arguments):
         return time.time()
     def __repr__(self):
         return "<native fn clock>"
 class Input(LoxCallable):
-    def arity(self): return 1
+    arity = 1
     def call(self, interpreter, arguments):
         return input(arguments[0])
     def __repr__(self):
         return "<native fn input>"
 class Print(LoxCallable):
-    def arity(self): return 1
+    arity = 1
     def call(self, interpreter, arguments):
         print(arguments[0])
         return arguments[0]
     def __repr__(self):
         return "<native fn print>"
 class Interpreter:
+    functionType = LoxFunction
     def __init__(self, lox):
         self.lox_class = lox
-        self.globals = Environment()
+        self.depth = 0
+        self.maxDepth = FRAMES_MAX
+        self.globals = GlobalEnvironment()
         self.environment = self.globals
         self.globals.define("clock", Clock())
         self.globals.define("input", Input())
         self.globals.define("print", Print())
-        self.locals = {}
+        self.inlineCaches = None
     def interpret(self, statements):
         try:
             for statement in statements:
                 self.execute(statement)
         except LoxRuntimeError as e:
             self.lox_class.runtimeError(e)
+    def interpretCompiled(self, program):
+        try:
+            program(self.globals)
+        except LoxRuntimeError as e:
+            self.lox_class.runtimeError(e)
     def visitLiteralExpr(self, expr):
         return expr.value
     def visitGroupingExpr(self, expr):
         return self.evaluate(expr.expression)
     def visitUnaryExpr(self, expr):
-        right = self.evaluate(expr.right)
-        if expr.operator.type == "MINUS":
-            self.checkNumberOperand(expr.operator, right)
-            return -float(right)
-        elif expr.operator.type == "BANG":
-            return not self.isTruthy(right.value)
+        return unaryOperators[expr.operator.type](expr.operator, self.evaluate(expr.right))
     def visitGetExpr(self, expr):
         object = self.evaluate(expr.object)
-        if type(object) == LoxInstance:
-            return object.get(expr.name)
-        raise LoxRuntimeError(expr.name, "Only instances have properties.")
+        if type(object) != LoxInstance:
+            raise LoxRuntimeError(expr.name, "Only instances have properties.")
+        cache = expr.cache
+        if cache == None:
+            cache = expr.cache = self.inlineCache("get", expr.name)
+        shape = object.shape
+        if shape is cache.shape:
+            slot, method = cache.entry
+        else:
+            slot, method = cache.lookup(shape)
+        if slot is not None:
+            return object.values[slot]
+        if method == None:
+            raise LoxRuntimeError(expr.name, f"Undefined property '{expr.name.lexeme}'.")
+        return method.bind(object)
     def visitSetExpr(self, expr):
         object = self.evaluate(expr.object)
         if type(object) != LoxInstance:
             raise LoxRuntimeError(expr.name, "Only instances have fields.")
         value = self.evaluate(expr.value)
-        object.set(expr.name, value)
+        cache = expr.cache
+        if cache == None:
+            cache = expr.cache = self.inlineCache("set", expr.name)
+        shape = object.shape
+        if shape is cache.shape:
+            slot, transition = cache.entry
+        else:
+            slot, transition = cache.lookup(shape)
+        if transition is None:
+            object.values[slot] = value
+        else:
+            object.shape = transition
+            object.values.append(value)
         return value
     def visitBinaryExpr(self, expr):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-        if expr.operator.type == "GREATER":
-            self.checkNumberOperands(expr.operator, left, right)
-            return float(left) > float(right)
-        elif expr.operator.type == "GREATER_EQUAL":
-            self.checkNumberOperands(expr.operator, left, right)
-            return float(left) >= float(right)
-        elif expr.operator.type == "LESS":
-            self.checkNumberOperands(expr.operator, left, right)
-            return float(left) < float(right)
-        elif expr.operator.type == "LESS_EQUAL":
-            self.checkNumberOperands(expr.operator, left, right)
-            return float(left) <= float(right)
-        elif expr.operator.type == "EQUAL_EQUAL":
-            self.checkNumberOperands(expr.operator, left, right)
-            return self.isEqual(left, right)
-        elif expr.operator.type == "BANG_EQUAL":
-            self.checkNumberOperands(expr.operator, left, right)
-            return not self.isEqual(left, right)
-        elif expr.operator.type == "MINUS":
-            self.checkNumberOperands(expr.operator, left, right)
-            return float(left) - float(right)
-        elif expr.operator.type == "SLASH":
-            self.checkNumberOperands(expr.operator, left, right)
-            if right == 0:
-                raise LoxRuntimeError(expr.operator, "You can't divide by 0")
-            return float(left) / float(right)
-        elif expr.operator.type == "STAR":
-            self.checkNumberOperands(expr.operator, left, right)
-            return float(left) * float(right)
-        elif expr.operator.type == "PLUS":
-            if type(left) == float and type(right) == float:
-                return float(left) + float(right)
-            elif type(left) == str and type(right) == str:
-                return str(left) + str(right)
-            raise LoxRuntimeError(expr.operator, "Operands must be two numbers or two strigns.")
-        elif expr.operator.type == "MODULO":
-            self.checkNumberOperands(expr.operator, left, right)
-            return float(left) % float(right)
-        return None
+        specialize(expr, left, right)
+        return binaryOperators[expr.operator.type](expr.operator, left, right)
+    def visitGenericBinaryExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        return binaryOperators[expr.operator.type](expr.operator, left, right)
+    def deoptimize(self, expr, left, right):
+        generalize(expr)
+        return binaryOperators[expr.operator.type](expr.operator, left, right)
+    def visitNumberAddExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float: return left + right
+        return self.deoptimize(expr, left, right)
+    def visitStringAddExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is str and type(right) is str: return left + right
+        return self.deoptimize(expr, left, right)
+    def visitNumberSubtractExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float: return left - right
+        return self.deoptimize(expr, left, right)
+    def visitNumberMultiplyExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float: return left * right
+        return self.deoptimize(expr, left, right)
+    def visitNumberDivideExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float and right != 0: return left / right
+        return self.deoptimize(expr, left, right)
+    def visitNumberModuloExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float and right != 0: return left % right
+        return self.deoptimize(expr, left, right)
+    def visitNumberGreaterExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float: return left > right
+        return self.deoptimize(expr, left, right)
+    def visitNumberGreaterEqualExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float: return left >= right
+        return self.deoptimize(expr, left, right)
+    def visitNumberLessExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float: return left < right
+        return self.deoptimize(expr, left, right)
+    def visitNumberLessEqualExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float: return left <= right
+        return self.deoptimize(expr, left, right)
+    def visitEqualExpr(self, expr):
+        return expr.left.accept(self) == expr.right.accept(self)
+    def visitNotEqualExpr(self, expr):
+        return expr.left.accept(self) != expr.right.accept(self)
     def visitVariableExpr(self, expr):
-        return self.lookUpVariable(expr.name, expr)
+        location = expr.location
+        if location is not None:
+            if location[2]: return self.environment.getAt(location[0], location[1]).value
+            return self.environment.getAt(location[0], location[1])
+        cell = expr.cell
+        if cell == None:
+            cell = expr.cell = self.globals.cell(expr.name.lexeme)
+        value = cell.value
+        if value is UNDEFINED:
+            raise LoxRuntimeError(expr.name, f"Undefined variable '{expr.name.lexeme}'.")
+        return value
     def lookUpVariable(self, name, expr):
-        try:
-            distance = self.locals[expr]
-            return self.environment.getAt(distance, name.lexeme)
-        except:
-            return self.globals.get(name)
+        distance, slot, boxed = expr.location
+        if boxed: return self.environment.getAt(distance, slot).value
+        return self.environment.getAt(distance, slot)
     def visitAssignExpr(self, expr):
         value = self.evaluate(expr.value)
-        try:
-            distance = self.locals[expr]
-            self.environment.assignAt(distance, expr.name, value)
-        except:
-            self.globals.assign(expr.name, value)
+        location = expr.location
+        if location is not None:
+            if location[2]:
+                self.environment.getAt(location[0], location[1]).value = value
+            else:
+                self.environment.assignAt(location[0], location[1], value)
+            return value
+        cell = expr.cell
+        if cell == None:
+            cell = expr.cell = self.globals.cell(expr.name.lexeme)
+        if cell.value is UNDEFINED:
+            raise LoxRuntimeError(expr.name, f"Undefined variable '{expr.name.lexeme}'.")
+        cell.value = value
         return value
     def visitLogicalExpr(self, expr):
         left = self.evaluate(expr.left)
-        if expr.operator.type == "OR":
+        if expr.operator.type == TokenType.OR:
             if self.isTruthy(left): return left
         else:
             if not self.isTruthy(left): return left
         return self.evaluate(expr.right)
     def visitCallExpr(self, expr):
-        callee = self.evaluate(expr.callee)
+        if type(expr.callee) == Get:
+            return self.invoke(expr)
+        if type(expr.callee) == Super:
+            return self.invokeSuper(expr)
+        return self.call(self.evaluate(expr.callee), expr)
+    def invoke(self, expr):
+        get = expr.callee
+        object = self.evaluate(get.object)
+        if type(object) != LoxInstance:
+            raise LoxRuntimeError(get.name, "Only instances have properties.")
+        cache = expr.cache
+        if cache == None:
+            cache = expr.cache = self.inlineCache("invoke", get.name)
+        shape = object.shape
+        if shape is cache.shape:
+            slot, method = cache.entry
+        else:
+            slot, method = cache.lookup(shape)
+        if slot is not None:
+            return self.call(object.values[slot], expr)
+        if method == None:
+            raise LoxRuntimeError(get.name, f"Undefined property '{get.name.lexeme}'.")
+        return self.callMethod(method, object, expr)
+    def invokeSuper(self, expr):
+        method, object = self.findSuperMethod(expr.callee)
+        return self.callMethod(method, object, expr)
+    def call(self, callee, expr):
         arguments = []
         for argument in expr.arguments:
             arguments.append(self.evaluate(argument))
         if not isinstance(callee, LoxCallable):
             raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
-        function = LoxCallable(callee) # Callee
-        if len(arguments) != function.arity():
-            raise LoxRuntimeError(expr.paren, f"Expected {function.arity()} arguments but got {len(arguments)}.")
-        return function.call(self, arguments)
+        if len(arguments) != callee.arity:
+            raise LoxRuntimeError(expr.paren, f"Expected {callee.arity} arguments but got {len(arguments)}.")
+        try:
+            return callee.call(self, arguments)
+        except RecursionError:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+    def callMethod(self, method, object, expr):
+        arguments = [object]
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+        if len(expr.arguments) != method.arity:
+            raise LoxRuntimeError(expr.paren, f"Expected {method.arity} arguments but got {len(expr.arguments)}.")
+        try:
+            return method.call(self, arguments)
+        except RecursionError:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
     def visitThisExpr(self, expr):
         return self.lookUpVariable(expr.keyword, expr)
     def visitSuperExpr(self, expr):
-        distance = self.locals[expr]
-        superclass = self.environment.getAt(distance, "super")
-        object = self.environment.getAt(distance-1, "this")
+        method, object = self.findSuperMethod(expr)
+        return method.bind(object)
+    def findSuperMethod(self, expr):
+        distance, slot, boxed, thisDistance, thisSlot, thisBoxed = expr.location
+        superclass = self.environment.getAt(distance, slot)
+        if boxed: superclass = superclass.value
+        object = self.environment.getAt(thisDistance, thisSlot)
+        if thisBoxed: object = object.value
         method = superclass.findMethod(expr.method.lexeme)
         if method == None:
             raise LoxRuntimeError(expr.method, f"Undefined property '{expr.method.lexeme}'.")
-        return method.bind(object)
+        return method, object
     def visitExpressionStmt(self, stmt):
         self.evaluate(stmt.expression)
         return None
     def visitFunctionStmt(self, stmt):
-        function = LoxFunction(stmt, self.environment, False)
-        self.environment.define(stmt.name.lexeme, function)
+        if stmt.location[0]:
+            upvalue = Upvalue(None)
+            self.environment.define(stmt.name.lexeme, upvalue)
+            upvalue.value = self.createFunction(stmt, False)
+        else:
+            self.environment.define(stmt.name.lexeme, self.createFunction(stmt, False))
         return None
+    def createFunction(self, declaration, isInitialiser):
+        boxed, upvalues, boxedSlots = declaration.location
+        closure = None
+        if len(upvalues) > 0:
+            environment = self.environment
+            values = []
+            for depth, slot in upvalues:
+                values.append(environment.values[slot] if depth == 0 else environment.getAt(depth, slot))
+            closure = Environment(None, values)
+        return self.functionType(declaration, closure, isInitialiser, boxedSlots)
     def visitReturnStmt(self, stmt):
-        value = None
-        if stmt.value != None:
-            value = self.evaluate(stmt.value)
-        raise Return(value)
+        value = stmt.value
+        if type(value) is not Call:
+            if value is None: return (None,)
+            return (value.accept(self),)
+        if type(value.callee) is not Get and type(value.callee) is not Super:
+            callee = self.evaluate(value.callee)
+            if type(callee) is self.functionType and len(value.arguments) == callee.arity:
+                return (None, callee, [self.evaluate(argument) for argument in value.arguments])
+            return (self.call(callee, value),)
+        return (self.evaluate(value),)
     def visitPrintStmt(self, stmt):
         value = self.evaluate(stmt.expression)
         print(self.stringify(value))
@@ -169,52 +305,89 @@ class Interpreter:
         value = None
         if stmt.initialiser != None:
             value = self.evaluate(stmt.initialiser)
+        if stmt.location:
+            value = Upvalue(value)
         self.environment.define(stmt.name.lexeme, value)
         return None
     def visitBlockStmt(self, stmt):
-        self.executeBlock(stmt.statements, Environment(self.environment))
-        return None
+        if stmt.location:
+            return self.executeBlock(stmt.statements, self.environment)
+        return self.executeBlock(stmt.statements, Environment(self.environment))
     def visitClassStmt(self, stmt):
         superclass = None
         if stmt.superclass != None:
             superclass = self.evaluate(stmt.superclass)
             if type(superclass) != LoxClass:
                 raise LoxRuntimeError(stmt.superclass.name, "Superclass must be a class.")
-        self.environment.define(stmt.name.lexeme, None)
+        boxed = stmt.location
+        if boxed:
+            upvalue = Upvalue(None)
+            self.environment.define(stmt.name.lexeme, upvalue)
         if stmt.superclass != None:
-            self.environment = Environment(self.environment)
-            self.environment.define("super", superclass)
+            self.environment = Environment(self.environment, [superclass])
         methods = {}
         for method in stmt.methods:
-            function = LoxFunction(method, self.environment, method.name.lexeme == "init")
-            methods[method.name.lexeme] = function
+            methods[method.name.lexeme] = self.createFunction(method, method.name.lexeme == "init")
         klass = LoxClass(stmt.name.lexeme, superclass, methods)
         if superclass != None:
             self.environment = self.environment.enclosing
-        self.environment.assign(stmt.name, klass)
+        if boxed:
+            upvalue.value = klass
+        else:
+            self.environment.define(stmt.name.lexeme, klass)
         return None
     def visitIfStmt(self, stmt):
         if self.isTruthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.thenBranch)
+            return stmt.thenBranch.accept(self)
         elif stmt.elseBranch != None:
-            self.execute(stmt.elseBranch)
+            return stmt.elseBranch.accept(self)
         return None
     def visitWhileStmt(self, stmt):
+        frame = self.loopFrame(stmt.body)
+        if frame is not None:
+            environment = Environment(self.environment)
+            while self.isTruthy(self.evaluate(stmt.condition)):
+                result = self.iterate(environment, frame)
+                if result is not None: return result
+            return None
         while self.isTruthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            result = stmt.body.accept(self)
+            if result is not None: return result
+        return None
+    def loopFrame(self, body):
+        if type(body) is not Block: return None
+        if not body.location: return (body.statements, ())
+        statements = body.statements
+        if len(statements) == 2 and type(statements[0]) is Block and not statements[0].location:
+            return (statements[0].statements, statements[1:])
+        return None
+    def iterate(self, environment, frame):
+        environment.values.clear()
+        result = self.executeBlock(frame[0], environment)
+        if result is not None: return result
+        for statement in frame[1]:
+            result = statement.accept(self)
+            if result is not None: return result
         return None
     def executeBlock(self, statements, environment):
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                result = statement.accept(self)
+                if result is not None: return result
+            return None
         finally:
             self.environment = previous
     def execute(self, stmt):
-        stmt.accept(self)
-    def resolve(self, expr, depth):
-        self.locals[expr] = depth
+        return stmt.accept(self)
+    def inlineCache(self, kind, token):
+        cache = InlineCache(kind, token, self.inlineCaches != None)
+        if self.inlineCaches != None:
+            self.inlineCaches.append(cache)
+        return cache
+    def resolve(self, node, location):
+        node.location = location
     def evaluate(self, expr):
         return expr.accept(self)
     def isTruthy(self, value):
@@ -222,16 +395,6 @@ class Interpreter:
         elif type(value) == bool: return bool(value)
         elif value == 0: return False
         return True
-    def isEqual(self, a, b):
-        if a == None and b == None: return True
-        if a == None: return False
-        return a == b
-    def checkNumberOperand(self, operator, operand):
-        if type(operand) == float: return
-        raise LoxRuntimeError(operator, "Operand should be a number.")
-    def checkNumberOperands(self, operator, left, right):
-        if type(left) == type(right) == float: return
-        raise LoxRuntimeError(operator, "Operands must be numbers.")
     def stringify(self, value):
         if value == None: return "nil"
         if type(value) == float:
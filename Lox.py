@@ -1,27 +1,137 @@
+import resource
 import sys
-if __name__ == "__main__":
-    from Scanner import *
-    from parser import *
-    from Interpreter import *
-    from Resolver import *
+from TokenType import *
+from Scanner import *
+from parser import *
+from Interpreter import *
+from Resolver import *
+from Compiler import *
+from VM import *
+from ClosureCompiler import *
+from Transpiler import *
+from ProgramCache import *
+from Optimizer import *
+from Inliner import *
+from ProfilingInterpreter import *
+from SamplingProfiler import *
+from TieredInterpreter import *
+
+PYTHON_FRAMES_PER_CALL = 20
+C_STACK_BYTES_PER_FRAME = 512
 
 class Lox:
     def __init__(self):
         self.hadError = False
         self.hadRuntimeError = False
         self.interpreter = Interpreter(self)
+        self.backend = "interpreter"
+        self.vm = None
+        self.transpiler = None
+        self.emitPython = False
+        self.stream = False
+        self.errorMode = "file"
+        self.cache = ProgramCache()
+        self.optimize = True
+        self.inlineStats = False
+        self.maxDepth = FRAMES_MAX
+        self.profile = None
+        self.sample = None
+        self.sampleRate = 1000
+        self.tierThreshold = None
+        self.tierStats = False
     def main(self):
-        if len(sys.argv) > 2:
-            print("Usage: python3 plox.py [script]")
+        args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+        flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+        for flag in flags:
+            if flag in ["--backend=interpreter", "--backend=closure", "--backend=python", "--backend=vm", "--backend=tiered"]:
+                self.backend = flag.split("=")[1]
+            elif flag == "--emit-python":
+                self.backend = "python"
+                self.emitPython = True
+            elif flag == "--stream":
+                self.stream = True
+            elif flag in ["--on-error=file", "--on-error=statement"]:
+                self.errorMode = flag.split("=")[1]
+            elif flag == "--no-optimize":
+                self.optimize = False
+            elif flag == "--inline-stats":
+                self.inlineStats = True
+            elif flag == "--no-cache":
+                self.cache = None
+            elif flag == "--ic-stats":
+                self.interpreter.inlineCaches = []
+            elif flag == "--profile" or flag.startswith("--profile="):
+                self.profile = flag[10:]
+            elif flag == "--sample" or flag.startswith("--sample="):
+                self.sample = flag[9:]
+            elif flag.startswith("--sample-rate=") and flag[14:].isdigit() and int(flag[14:]) > 0:
+                self.sampleRate = int(flag[14:])
+            elif flag.startswith("--tier-threshold=") and flag[17:].isdigit() and int(flag[17:]) > 0:
+                self.tierThreshold = int(flag[17:])
+            elif flag == "--tier-stats":
+                self.tierStats = True
+            elif flag.startswith("--max-depth=") and flag[12:].isdigit() and int(flag[12:]) > 0:
+                self.maxDepth = int(flag[12:])
+            else:
+                args = None
+                break
+        if self.profile != None and (self.backend != "interpreter" or len(args) != 1):
+            args = None
+        if self.sample != None and self.backend not in ["interpreter", "vm"]:
+            args = None
+        if (self.tierThreshold != None or self.tierStats) and self.backend != "tiered":
+            args = None
+        if self.interpreter.inlineCaches != None and self.backend in ["vm", "python"]:
+            args = None
+        if args == None or len(args) > 1:
+            print("Usage: python3 plox.py [--backend=interpreter|closure|python|vm|tiered] [--emit-python] [--stream] [--on-error=file|statement] [--no-optimize] [--inline-stats] [--no-cache] [--ic-stats] [--max-depth=N] [--profile[=FILE]] [--sample[=FILE]] [--sample-rate=HZ] [--tier-threshold=N] [--tier-stats] [script]")
             exit(64)
-        elif len(sys.argv) == 2:
-            self.runFile(sys.argv[1])
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), self.recursionLimit()))
+        if self.profile != None:
+            profiler = ProfilingInterpreter(self)
+            profiler.inlineCaches = self.interpreter.inlineCaches
+            self.interpreter = profiler
+        if self.backend == "tiered":
+            tiered = TieredInterpreter(self)
+            tiered.inlineCaches = self.interpreter.inlineCaches
+            if self.tierThreshold != None:
+                tiered.threshold = self.tierThreshold
+            self.interpreter = tiered
+        self.interpreter.maxDepth = self.maxDepth
+        if len(args) == 1:
+            self.runFile(args[0])
         else:
             self.runPrompt()
+    def recursionLimit(self):
+        limit = self.maxDepth * PYTHON_FRAMES_PER_CALL
+        stack = resource.getrlimit(resource.RLIMIT_STACK)[0]
+        if stack != resource.RLIM_INFINITY:
+            limit = min(limit, stack // C_STACK_BYTES_PER_FRAME)
+        return limit
     def runFile(self, path):
         with open(path) as file:
             code = file.read()
-        self.run(code)
+        if self.sample != None:
+            sampler = SamplingProfiler(self.sampleRate)
+            sampler.start()
+            try:
+                self.run(code, path)
+            finally:
+                sampler.stop()
+            if self.sample == "":
+                sampler.report(sys.stderr)
+            else:
+                with open(self.sample, "w") as file:
+                    sampler.report(file)
+        else:
+            self.run(code, path)
+        if self.interpreter.inlineCaches != None:
+            self.reportInlineCaches()
+        if self.profile != None:
+            self.interpreter.report(sys.stderr)
+            self.interpreter.writeCollapsed(self.profile or path + ".collapsed")
+        if self.tierStats:
+            self.interpreter.report(sys.stderr)
         if self.hadError: exit(65)
         if self.hadRuntimeError: exit(70)
     def runPrompt(self):
@@ -30,17 +140,33 @@ class Lox:
             if line == None: break
             self.run(line)
             self.hadError = False
-    def run(self, source):
+    def run(self, source, path=None):
         try:
-            scanner = Scanner(source, self)
-            tokens = scanner.scanTokens()
-            parser = Parser(tokens, self)
-            statements = parser.parse()
-            if self.hadError: return
-            resolver = Resolver(self.interpreter, self)
-            resolver.resolve(statements)
-            if self.hadError: return
-            self.interpreter.interpret(statements)
+            if self.stream:
+                self.runStream(source)
+                return
+            statements = None
+            if path != None and self.cache != None:
+                statements = self.cache.load(path, source)
+            if statements == None:
+                scanner = Scanner(source, self)
+                tokens = scanner.scanTokens()
+                parser = Parser(tokens, self)
+                statements = parser.parse()
+                if self.hadError: return
+                resolver = Resolver(self.interpreter, self)
+                resolver.resolve(statements)
+                if self.hadError: return
+                if path != None and self.cache != None:
+                    self.cache.store(path, source, statements)
+            if self.optimize and path != None:
+                inliner = Inliner()
+                statements = inliner.inline(statements)
+                if self.inlineStats:
+                    print(f"Inlined {inliner.inlined} call sites", file=sys.stderr)
+            elif self.optimize:
+                statements = Optimizer().optimize(statements)
+            self.execute(statements)
         except KeyboardInterrupt:
             print("Cancel")
             self.hadError = True
@@ -48,10 +174,53 @@ class Lox:
         #print(expr)
         #for token in tokens:
         #    print(token)
+    def runStream(self, source):
+        parser = Parser(Scanner(source, self).scan(), self)
+        resolver = Resolver(self.interpreter, self)
+        failed = self.hadError
+        executing = not failed
+        self.hadError = False
+        for statement in parser.declarations():
+            if not self.hadError:
+                resolver.resolve(statement)
+            if self.hadError:
+                failed = True
+                self.hadError = False
+                if self.errorMode == "file": executing = False
+                continue
+            if executing:
+                self.execute(Optimizer().optimize([statement]) if self.optimize else [statement])
+                if self.hadRuntimeError: break
+        self.hadError = failed
+    def execute(self, statements):
+        if self.backend == "vm":
+            function = Compiler(self).compile(statements)
+            if self.vm == None:
+                self.vm = VM(self)
+                self.vm.maxFrames = self.maxDepth
+            self.vm.interpret(function)
+        elif self.backend == "python":
+            if self.transpiler == None: self.transpiler = Transpiler(self)
+            source = self.transpiler.transpile(statements)
+            if self.emitPython:
+                print(source, end="")
+            else:
+                self.transpiler.run(source)
+        elif self.backend == "closure":
+            program = ClosureCompiler(self.interpreter).compile(statements)
+            self.interpreter.interpretCompiled(program)
+        else:
+            self.interpreter.interpret(statements)
+    def reportInlineCaches(self):
+        caches = sorted(self.interpreter.inlineCaches, key=lambda cache: (-cache.misses, cache.token.line))
+        print("Inline caches:", file=sys.stderr)
+        for cache in caches:
+            if cache.hits + cache.misses > 0:
+                print(f"  {cache}", file=sys.stderr)
     def error(self, line, message):
         self.report(line, '', message)
     def parseError(self, token, message):
-        if token.type == "EOF": 
+        if token.type == TokenType.EOF: 
             self.report(token.line, "at end", message)
         else:
             self.report(token.line, f"at '{token.lexeme}'", message)
@@ -61,5 +230,6 @@ class Lox:
     def runtimeError(self, e):
         print(f"[line {e.token.line}] {str(e.args[1])}")
         self.hadRuntimeError = True
-lox = Lox()
-lox.main()
+if __name__ == "__main__":
+    lox = Lox()
+    lox.main()
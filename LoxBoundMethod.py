@@ -0,0 +1,11 @@
+from LoxCallable import *
+
+class LoxBoundMethod(LoxCallable):
+    def __init__(self, receiver, method):
+        self.receiver = receiver
+        self.method = method
+        self.arity = method.arity
+    def call(self, interpreter, arguments):
+        return self.method.call(interpreter, [self.receiver] + arguments)
+    def __repr__(self):
+        return repr(self.method)
@@ -1,9 +1,4 @@
 class LoxCallable:
-    def __init__(self, callee=None):
-        if callee != None:
-            self.call = callee.call
-            self.arity = callee.arity
+    arity = 0
     def call(self, interpeter, arguments):
         pass
-    def arity(self):
-        pass
@@ -1,26 +1,28 @@
 from LoxCallable import *
 from LoxInstance import *
+from Shape import *
 
 class LoxClass(LoxCallable):
     def __init__(self, name, superclass, methods):
         self.name = name
-        self.methods = methods
-        self.superclass = superclass
+        self.superclass = None
+        self.methods = {}
+        self.shape = Shape(self, {})
+        if superclass != None:
+            self.inherit(superclass)
+        self.methods.update(methods)
+        initialiser = self.methods.get("init")
+        self.arity = 0 if initialiser == None else initialiser.arity
     def __repr__(self):
         return self.name
+    def inherit(self, superclass):
+        self.superclass = superclass
+        self.methods.update(superclass.methods)
     def call(self, interpreter, arguments):
         instance = LoxInstance(self)
-        initialiser = self.findMethod("init")
+        initialiser = self.methods.get("init")
         if initialiser != None:
-            initialiser.bind(instance).call(interpreter, arguments)
+            initialiser.call(interpreter, [instance] + arguments)
         return instance
-    def arity(self):
-        initialiser = self.findMethod("init")
-        if initialiser == None: return 0
-        return initialiser.arity()
     def findMethod(self, name):
-        if name in self.methods.keys():
-            return self.methods[name]
-        if self.superclass != None:
-            return self.superclass.findMethod(name)
-        return None
+        return self.methods.get(name)
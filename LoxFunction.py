@@ -1,28 +1,32 @@
 from Environment import *
 from LoxCallable import *
-from Return import *
+from LoxBoundMethod import *
 
 class LoxFunction(LoxCallable):
-    def __init__(self, declaration, closure, isInitialiser):
+    def __init__(self, declaration, closure, isInitialiser, boxed=()):
         self.isInitialiser = isInitialiser
         self.declaration = declaration
         self.closure = closure
+        self.boxed = boxed
+        self.arity = len(declaration.params)
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
-        for param, arg in zip(self.declaration.params, arguments):
-            environment.define(param.lexeme, arg)
+        if interpreter.depth >= interpreter.maxDepth: raise RecursionError
+        interpreter.depth += 1
         try:
-            interpreter.executeBlock(self.declaration.body, environment)
-        except Return as e:
-            if self.isInitialiser: return self.closure.getAt(0, "this")
-            return e.value
-        if self.isInitialiser: return self.closure.getAt(0, "this")
-        return None
-    def arity(self):
-        return len(self.declaration.params)
+            function = self
+            while True:
+                if function.boxed: function.box(arguments)
+                result = interpreter.executeBlock(function.declaration.body, Environment(function.closure, arguments))
+                if function.isInitialiser: return arguments[0]
+                if result is None: return None
+                if len(result) == 1: return result[0]
+                function, arguments = result[1], result[2]
+        finally:
+            interpreter.depth -= 1
     def __repr__(self):
         return f"<fn {self.declaration.name.lexeme}>"
+    def box(self, arguments):
+        for slot in self.boxed:
+            arguments[slot] = Upvalue(arguments[slot])
     def bind(self, instance):
-        environment = Environment(self.closure)
-        environment.define("this", instance)
-        return LoxFunction(self.declaration, environment, self.isInitialiser)
+        return LoxBoundMethod(instance, self)
@@ -1,16 +1,26 @@
 from LoxRuntimeError import *
 
 class LoxInstance:
+    __slots__ = ("klass", "shape", "values")
     def __init__(self, klass):
         self.klass = klass
-        self.fields = {}
+        self.shape = klass.shape
+        self.values = []
     def __repr__(self):
         return self.klass.name + " instance"
     def get(self, name):
-        if name.lexeme in self.fields.keys():
-            return self.fields[name.lexeme]
+        slot = self.shape.slots.get(name.lexeme)
+        if slot != None:
+            return self.values[slot]
         method = self.klass.findMethod(name.lexeme)
         if method != None: return method.bind(self)
         raise LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
     def set(self, name, value):
-        self.fields[name.lexeme] = value
+        self.setField(name.lexeme, value)
+    def setField(self, name, value):
+        slot = self.shape.slots.get(name)
+        if slot != None:
+            self.values[slot] = value
+        else:
+            self.shape = self.shape.withField(name)
+            self.values.append(value)
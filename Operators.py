@@ -0,0 +1,63 @@
+from LoxRuntimeError import *
+from TokenType import *
+
+def add(operator, left, right):
+    if type(left) is float and type(right) is float: return left + right
+    if type(left) is str and type(right) is str: return left + right
+    raise LoxRuntimeError(operator, "Operands must be two numbers or two strigns.")
+def subtract(operator, left, right):
+    if type(left) is float and type(right) is float: return left - right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+def multiply(operator, left, right):
+    if type(left) is float and type(right) is float: return left * right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+def divide(operator, left, right):
+    if type(left) is not float or type(right) is not float:
+        raise LoxRuntimeError(operator, "Operands must be numbers.")
+    if right == 0:
+        raise LoxRuntimeError(operator, "You can't divide by 0")
+    return left / right
+def modulo(operator, left, right):
+    if type(left) is not float or type(right) is not float:
+        raise LoxRuntimeError(operator, "Operands must be numbers.")
+    if right == 0:
+        raise LoxRuntimeError(operator, "You can't divide by 0")
+    return left % right
+def greater(operator, left, right):
+    if type(left) is float and type(right) is float: return left > right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+def greaterEqual(operator, left, right):
+    if type(left) is float and type(right) is float: return left >= right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+def less(operator, left, right):
+    if type(left) is float and type(right) is float: return left < right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+def lessEqual(operator, left, right):
+    if type(left) is float and type(right) is float: return left <= right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+def equal(operator, left, right):
+    return left == right
+def notEqual(operator, left, right):
+    return left != right
+def negate(operator, right):
+    if type(right) is float: return -right
+    raise LoxRuntimeError(operator, "Operand should be a number.")
+def bang(operator, right):
+    return right is None or right == 0
+
+binaryOperators = [None] * len(TokenType)
+binaryOperators[TokenType.PLUS] = add
+binaryOperators[TokenType.MINUS] = subtract
+binaryOperators[TokenType.STAR] = multiply
+binaryOperators[TokenType.SLASH] = divide
+binaryOperators[TokenType.MODULO] = modulo
+binaryOperators[TokenType.GREATER] = greater
+binaryOperators[TokenType.GREATER_EQUAL] = greaterEqual
+binaryOperators[TokenType.LESS] = less
+binaryOperators[TokenType.LESS_EQUAL] = lessEqual
+binaryOperators[TokenType.EQUAL_EQUAL] = equal
+binaryOperators[TokenType.BANG_EQUAL] = notEqual
+
+unaryOperators = [None] * len(TokenType)
+unaryOperators[TokenType.MINUS] = negate
+unaryOperators[TokenType.BANG] = bang
@@ -0,0 +1,120 @@
+from Expr import *
+from Stmt import *
+from LoxRuntimeError import *
+from Operators import *
+from TokenType import *
+import math
+
+class Optimizer:
+    def optimize(self, statements):
+        return self.statements(statements)
+    def statements(self, statements):
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is None: continue
+            optimized.append(statement)
+            if type(statement) == Return: break
+        return optimized
+    def statement(self, statement):
+        statement = statement.accept(self)
+        if statement is None: return Block([])
+        return statement
+    def expression(self, expr):
+        return expr.accept(self)
+    def literal(self, value, expr):
+        if type(value) is float and not math.isfinite(value): return expr
+        return Literal(value)
+    def isTruthy(self, value):
+        return not (value is None or value == 0)
+    def visitBlockStmt(self, stmt):
+        stmt.statements = self.statements(stmt.statements)
+        return stmt
+    def visitClassStmt(self, stmt):
+        for method in stmt.methods:
+            method.accept(self)
+        return stmt
+    def visitExpressionStmt(self, stmt):
+        stmt.expression = self.expression(stmt.expression)
+        return stmt
+    def visitFunctionStmt(self, stmt):
+        stmt.body = self.statements(stmt.body)
+        return stmt
+    def visitIfStmt(self, stmt):
+        stmt.condition = self.expression(stmt.condition)
+        if type(stmt.condition) == Literal:
+            if self.isTruthy(stmt.condition.value):
+                return stmt.thenBranch.accept(self)
+            if stmt.elseBranch != None:
+                return stmt.elseBranch.accept(self)
+            return None
+        stmt.thenBranch = self.statement(stmt.thenBranch)
+        if stmt.elseBranch != None:
+            stmt.elseBranch = stmt.elseBranch.accept(self)
+        return stmt
+    def visitPrintStmt(self, stmt):
+        stmt.expression = self.expression(stmt.expression)
+        return stmt
+    def visitReturnStmt(self, stmt):
+        if stmt.value != None:
+            stmt.value = self.expression(stmt.value)
+        return stmt
+    def visitVarStmt(self, stmt):
+        if stmt.initialiser != None:
+            stmt.initialiser = self.expression(stmt.initialiser)
+        return stmt
+    def visitWhileStmt(self, stmt):
+        stmt.condition = self.expression(stmt.condition)
+        if type(stmt.condition) == Literal and not self.isTruthy(stmt.condition.value):
+            return None
+        stmt.body = self.statement(stmt.body)
+        return stmt
+    def visitAssignExpr(self, expr):
+        expr.value = self.expression(expr.value)
+        return expr
+    def visitBinaryExpr(self, expr):
+        expr.left = self.expression(expr.left)
+        expr.right = self.expression(expr.right)
+        if type(expr.left) == Literal and type(expr.right) == Literal:
+            try:
+                return self.literal(binaryOperators[expr.operator.type](expr.operator, expr.left.value, expr.right.value), expr)
+            except (LoxRuntimeError, ArithmeticError):
+                pass
+        return expr
+    def visitCallExpr(self, expr):
+        expr.callee = self.expression(expr.callee)
+        expr.arguments = [self.expression(argument) for argument in expr.arguments]
+        return expr
+    def visitGetExpr(self, expr):
+        expr.object = self.expression(expr.object)
+        return expr
+    def visitGroupingExpr(self, expr):
+        return self.expression(expr.expression)
+    def visitLiteralExpr(self, expr):
+        return expr
+    def visitLogicalExpr(self, expr):
+        expr.left = self.expression(expr.left)
+        expr.right = self.expression(expr.right)
+        if type(expr.left) == Literal:
+            if self.isTruthy(expr.left.value) == (expr.operator.type == TokenType.OR):
+                return expr.left
+            return expr.right
+        return expr
+    def visitSetExpr(self, expr):
+        expr.object = self.expression(expr.object)
+        expr.value = self.expression(expr.value)
+        return expr
+    def visitSuperExpr(self, expr):
+        return expr
+    def visitThisExpr(self, expr):
+        return expr
+    def visitUnaryExpr(self, expr):
+        expr.right = self.expression(expr.right)
+        if type(expr.right) == Literal:
+            try:
+                return self.literal(unaryOperators[expr.operator.type](expr.operator, expr.right.value), expr)
+            except LoxRuntimeError:
+                pass
+        return expr
+    def visitVariableExpr(self, expr):
+        return expr
@@ -0,0 +1,153 @@
+from Interpreter import *
+from Stmt import Block
+from Token import Token
+import time
+
+def firstLine(node):
+    for kind in type(node).__mro__[:-1]:
+        for field in kind.__slots__:
+            value = getattr(node, field)
+            for item in value if type(value) == list else [value]:
+                if type(item) == Token: return item.line
+                if hasattr(item, "accept"):
+                    line = firstLine(item)
+                    if line != None: return line
+    return None
+
+class FunctionProfile:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.active = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+
+class ProfilingInterpreter(Interpreter):
+    def __init__(self, lox):
+        super().__init__(lox)
+        self.profiles = {}
+        self.owners = {}
+        self.lineHits = {}
+        self.statementLines = {}
+        self.line = None
+        self.stack = []
+        self.path = ["<script>"]
+        self.collapsed = {}
+        self.started = time.perf_counter()
+        self.childTime = [0.0]
+    def execute(self, stmt):
+        if type(stmt) is Block: return stmt.accept(self)
+        line = self.statementLines.get(stmt)
+        if line == None:
+            line = self.statementLines[stmt] = firstLine(stmt) or self.line
+        if line == None: return stmt.accept(self)
+        self.lineHits[line] = self.lineHits.get(line, 0) + 1
+        previous = self.line
+        self.line = line
+        result = stmt.accept(self)
+        self.line = previous
+        return result
+    def executeBlock(self, statements, environment):
+        previous = self.environment
+        try:
+            self.environment = environment
+            for statement in statements:
+                result = self.execute(statement)
+                if result is not None: return result
+            return None
+        finally:
+            self.environment = previous
+    def visitIfStmt(self, stmt):
+        if self.isTruthy(self.evaluate(stmt.condition)):
+            return self.execute(stmt.thenBranch)
+        elif stmt.elseBranch != None:
+            return self.execute(stmt.elseBranch)
+        return None
+    def visitWhileStmt(self, stmt):
+        while self.isTruthy(self.evaluate(stmt.condition)):
+            result = self.execute(stmt.body)
+            if result is not None: return result
+        return None
+    def visitReturnStmt(self, stmt):
+        if stmt.value == None: return (None,)
+        return (self.evaluate(stmt.value),)
+    def visitClassStmt(self, stmt):
+        for method in stmt.methods:
+            self.owners[method] = stmt.name.lexeme
+        return super().visitClassStmt(stmt)
+    def call(self, callee, expr):
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
+        if len(arguments) != callee.arity:
+            raise LoxRuntimeError(expr.paren, f"Expected {callee.arity} arguments but got {len(arguments)}.")
+        return self.profileCall(callee, arguments, expr)
+    def callMethod(self, method, object, expr):
+        arguments = [object]
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+        if len(expr.arguments) != method.arity:
+            raise LoxRuntimeError(expr.paren, f"Expected {method.arity} arguments but got {len(expr.arguments)}.")
+        return self.profileCall(method, arguments, expr)
+    def profileCall(self, callee, arguments, expr):
+        profile = self.profileFor(callee)
+        profile.calls += 1
+        profile.active += 1
+        self.path.append(profile.name)
+        self.childTime.append(0.0)
+        start = time.perf_counter()
+        try:
+            return callee.call(self, arguments)
+        except RecursionError:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self.childTime.pop()
+            self.childTime[-1] += elapsed
+            profile.active -= 1
+            if profile.active == 0: profile.inclusive += elapsed
+            profile.exclusive += elapsed - children
+            stack = ";".join(self.path)
+            self.collapsed[stack] = self.collapsed.get(stack, 0.0) + elapsed - children
+            self.path.pop()
+    def profileFor(self, callee):
+        key = callee
+        if type(callee) == LoxBoundMethod:
+            key = callee.method
+        elif type(callee) == LoxClass:
+            key = callee.methods.get("init", callee)
+        profile = self.profiles.get(key)
+        if profile == None:
+            profile = self.profiles[key] = FunctionProfile(self.functionName(callee, key))
+        return profile
+    def functionName(self, callee, key):
+        if type(key) == LoxClass:
+            return key.name
+        if isinstance(key, LoxFunction):
+            declaration = key.declaration
+            owner = self.owners.get(declaration)
+            if owner == None: return f"{declaration.name.lexeme} (line {declaration.name.line})"
+            return f"{owner}.{declaration.name.lexeme} (line {declaration.name.line})"
+        return repr(key)
+    def report(self, file):
+        total = time.perf_counter() - self.started
+        script = total - sum(profile.exclusive for profile in self.profiles.values())
+        self.collapsed["<script>"] = self.collapsed.get("<script>", 0.0) + script
+        profiles = sorted(self.profiles.values(), key=lambda profile: -profile.exclusive)
+        print(f"Profile: {total:.3f}s total", file=file)
+        print(f"{'calls':>10} {'self (s)':>10} {'self %':>7} {'total (s)':>10} {'per call (us)':>14}  function", file=file)
+        for profile in profiles:
+            perCall = profile.inclusive / profile.calls * 1e6
+            print(f"{profile.calls:>10} {profile.exclusive:>10.3f} {profile.exclusive / total * 100:>6.1f}% {profile.inclusive:>10.3f} {perCall:>14.1f}  {profile.name}", file=file)
+        print(f"{'':>10} {script:>10.3f} {script / total * 100:>6.1f}% {total:>10.3f} {'':>14}  <script>", file=file)
+        print("Line hits:", file=file)
+        for line, hits in sorted(self.lineHits.items(), key=lambda item: -item[1])[:20]:
+            print(f"{hits:>10}  line {line}", file=file)
+    def writeCollapsed(self, path):
+        with open(path, "w") as file:
+            for stack, seconds in sorted(self.collapsed.items()):
+                microseconds = round(seconds * 1e6)
+                if microseconds > 0:
+                    file.write(f"{stack} {microseconds}\n")
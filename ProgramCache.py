@@ -0,0 +1,95 @@
+import gc
+import hashlib
+import marshal
+import os
+import sys
+import Expr
+import Stmt
+from Token import Token
+from TokenType import *
+
+MAGIC = b"LOXC"
+TOKEN = -1
+FRONTEND = ["Scanner.py", "parser.py", "Resolver.py", "Expr.py", "Stmt.py", "Token.py", "TokenType.py", "ProgramCache.py"]
+
+class ProgramCache:
+    def __init__(self):
+        self.kinds = [getattr(module, name) for module in [Expr, Stmt] for name in sorted(vars(module)) if isinstance(getattr(module, name), type)]
+        self.kindIndex = {kind: i for i, kind in enumerate(self.kinds)}
+        self.fields = [kind.__init__.__code__.co_varnames[1:kind.__init__.__code__.co_argcount] for kind in self.kinds]
+        self.tokenTypes = list(TokenType)
+        self.version = None
+    def versionKey(self):
+        if self.version == None:
+            digest = hashlib.sha256(sys.version.encode())
+            directory = os.path.dirname(os.path.abspath(__file__))
+            for name in FRONTEND:
+                with open(os.path.join(directory, name), "rb") as file:
+                    digest.update(file.read())
+            self.version = digest.digest()
+        return self.version
+    def pathFor(self, path):
+        directory, name = os.path.split(os.path.abspath(path))
+        return os.path.join(directory, "__loxcache__", name + "c")
+    def load(self, path, source):
+        try:
+            with open(self.pathFor(path), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            magic, version, sourceHash, treeHash, tree = marshal.loads(data)
+            if magic != MAGIC or version != self.versionKey() or sourceHash != hashlib.sha256(source.encode()).digest():
+                return None
+            if type(tree) != bytes or treeHash != hashlib.sha256(tree).digest():
+                return None
+            statements = self.decode(marshal.loads(tree))
+        except (ValueError, EOFError, TypeError, IndexError, KeyError):
+            return None
+        finally:
+            if collecting: gc.enable()
+        return statements
+    def store(self, path, source, statements):
+        cachePath = self.pathFor(path)
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            tree = marshal.dumps(self.encode(statements))
+            data = marshal.dumps((MAGIC, self.versionKey(), hashlib.sha256(source.encode()).digest(), hashlib.sha256(tree).digest(), tree))
+        finally:
+            if collecting: gc.enable()
+        temporary = f"{cachePath}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+            with open(temporary, "wb") as file:
+                file.write(data)
+            os.replace(temporary, cachePath)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+    def encode(self, value):
+        if type(value) == list:
+            return [self.encode(item) for item in value]
+        if type(value) == Token:
+            lexeme = sys.intern(value.lexeme)
+            return (TOKEN, int(value.type), lexeme, lexeme if value.literal is value.lexeme else value.literal, value.line)
+        index = self.kindIndex.get(type(value))
+        if index == None:
+            return value
+        return (index, getattr(value, "location", None)) + tuple(self.encode(getattr(value, field)) for field in self.fields[index])
+    def decode(self, value):
+        if type(value) == list:
+            return [self.decode(item) for item in value]
+        if type(value) != tuple:
+            return value
+        index = value[0]
+        if index == TOKEN:
+            return Token(self.tokenTypes[value[1]], value[2], value[3], value[4])
+        node = self.kinds[index](*[self.decode(field) for field in value[2:]])
+        if value[1] != None:
+            node.location = value[1]
+        return node
@@ -1,11 +1,30 @@
+from Stmt import Function, Class, Var, Block
+
+class FunctionScope:
+    def __init__(self, start):
+        self.start = start
+        self.upvalues = []
+        self.indices = {}
+
 class Resolver:
     def __init__(self, interpreter, lox_class):
         self.interpeter = interpreter
         self.scopes = []
+        self.slots = []
+        self.captures = []
+        self.assignments = []
+        self.functions = [FunctionScope(0)]
+        self.pending = []
         self.lox = lox_class
         self.currentFunction = "NONE"
         self.currentClass = "NONE"
     def visitBlockStmt(self, stmt):
+        for statement in stmt.statements:
+            if type(statement) in (Var, Function, Class): break
+        else:
+            self.resolve(stmt.statements)
+            self.interpeter.resolve(stmt, True)
+            return None
         self.beginScope()
         self.resolve(stmt.statements)
         self.endScope()
@@ -15,11 +34,13 @@ class Resolver:
         if stmt.initialiser != None:
             self.resolve(stmt.initialiser)
         self.define(stmt.name)
+        if len(self.scopes) > 0:
+            self.pending.append((stmt, self.captures[-1], self.assignments[-1]))
         return None
     def visitFunctionStmt(self, stmt):
         self.declare(stmt.name)
         self.define(stmt.name)
-        self.resolveFunction(stmt, "FUNCTION")
+        self.resolveFunction(stmt, "FUNCTION", self.declareBinding(stmt.name))
         return None
     def visitExpressionStmt(self, stmt):
         self.resolve(stmt.expression)
@@ -53,19 +74,21 @@ class Resolver:
         if stmt.superclass != None:
             self.currentClass = "SUBCLASS"
             self.resolve(stmt.superclass)
+        binding = self.declareBinding(stmt.name)
+        if binding != None:
+            self.pending.append((stmt,) + binding)
         if stmt.superclass != None:
             self.beginScope()
             self.scopes[-1]["super"] = True
-        self.beginScope()
-        self.scopes[-1]["this"] = True
+            self.slots[-1]["super"] = 0
         for method in stmt.methods:
             declaration = "METHOD"
             if method.name.lexeme == "init":
                 declaration = "INITIALISER"
-            self.resolveFunction(method, declaration)
-        self.endScope()
+            self.resolveFunction(method, declaration, None)
         if stmt.superclass != None: self.endScope()
         self.currentClass = enclosingClass
+        if len(self.scopes) == 0: self.finish()
         return None
     def visitGetExpr(self, expr):
         self.resolve(expr.object)
@@ -75,7 +98,9 @@ class Resolver:
             self.lox.parseError(expr.keyword, "Can't use 'super' outside a class.")
         elif self.currentClass != "SUBCLASS":
             self.lox.parseError(expr.keyword, "Can't use 'super' in a class with no superclass.")
-        self.resolveLocal(expr, expr.keyword)
+        superPart = self.locate("super")
+        if superPart != None:
+            self.pending.append((expr, superPart, self.locate("this")))
         return None
     def visitSetExpr(self, expr):
         self.resolve(expr.value)
@@ -130,32 +155,93 @@ class Resolver:
         if name.lexeme in scope.keys():
             self.lox.error(name, "Already a variable with this name in this scope.")
         scope[name.lexeme] = False
+        slots = self.slots[-1]
+        if name.lexeme not in slots.keys():
+            slots[name.lexeme] = len(slots)
     def define(self, name):
         if len(self.scopes) == 0: return
         self.scopes[-1][name.lexeme] = True
+    def declareBinding(self, name):
+        if len(self.scopes) == 0: return None
+        self.assignments[-1].add(name.lexeme)
+        return (self.captures[-1], self.assignments[-1])
     def resolveLocal(self, expr, name):
+        part = self.locate(name.lexeme)
+        if part != None:
+            self.pending.append((expr, part))
+        return part
+    def locate(self, name):
         for i in range(len(self.scopes)-1, -1, -1):
-            if name.lexeme in self.scopes[i].keys():
-                self.interpeter.resolve(expr, len(self.scopes)-1-i)
-                return
-    def resolveFunction(self, function, type):
+            if name in self.scopes[i].keys():
+                function = self.functions[-1]
+                if i >= function.start:
+                    return (self.captures[i], self.assignments[i], name, len(self.scopes)-1-i, self.slots[i][name])
+                return (self.captures[i], self.assignments[i], name, len(self.scopes) - function.start, self.upvalue(len(self.functions)-1, i, name))
+        return None
+    def upvalue(self, index, scope, name):
+        function = self.functions[index]
+        key = (scope, name)
+        if key not in function.indices:
+            enclosing = self.functions[index-1]
+            if scope >= enclosing.start:
+                self.captures[scope].add(name)
+                location = (function.start - 1 - scope, self.slots[scope][name])
+            else:
+                location = (function.start - enclosing.start, self.upvalue(index-1, scope, name))
+            function.indices[key] = len(function.upvalues)
+            function.upvalues.append(location)
+        return function.indices[key]
+    def resolveFunction(self, function, type, binding):
         enclosingFunction = self.currentFunction
         self.currentFunction = type
         self.beginScope()
+        scope = FunctionScope(len(self.scopes)-1)
+        self.functions.append(scope)
+        if type != "FUNCTION":
+            self.scopes[-1]["this"] = True
+            self.slots[-1]["this"] = 0
         for param in function.params:
             self.declare(param)
             self.define(param)
+        parameters = len(self.slots[-1])
         self.resolve(function.body)
+        self.pending.append((function, binding, scope.upvalues, self.slots[-1], self.captures[-1], self.assignments[-1], parameters))
+        self.functions.pop()
         self.endScope()
         self.currentFunction = enclosingFunction
     def visitAssignExpr(self, expr):
         self.resolve(expr.value)
-        self.resolveLocal(expr, expr.name)
+        part = self.resolveLocal(expr, expr.name)
+        if part != None: part[1].add(expr.name.lexeme)
         return None
     def beginScope(self):
         self.scopes.append({})
+        self.slots.append({})
+        self.captures.append(set())
+        self.assignments.append(set())
     def endScope(self):
         self.scopes.pop()
+        self.slots.pop()
+        self.captures.pop()
+        self.assignments.pop()
+        if len(self.scopes) == 0:
+            self.finish()
+    def finish(self):
+        for record in self.pending:
+            node = record[0]
+            if type(node) == Var or type(node) == Class:
+                if node.name.lexeme not in record[1] or node.name.lexeme not in record[2]: continue
+                location = True
+            elif type(node) == Function:
+                node, binding, upvalues, slots, captures, assignments, parameters = record
+                boxed = binding != None and node.name.lexeme in binding[0]
+                location = (boxed, tuple(upvalues), tuple(sorted(slots[name] for name in captures & assignments if slots[name] < parameters)))
+            else:
+                location = ()
+                for captures, assignments, name, depth, slot in record[1:]:
+                    location += (depth, slot, name in captures and name in assignments)
+            self.interpeter.resolve(node, location)
+        self.pending = []
 
 functionType = [
     "NONE",
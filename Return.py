@@ -1,4 +0,0 @@
-from LoxRuntimeError import *
-class Return(LoxRuntimeError):
-    def __init__(self, value):
-        self.value = value
@@ -0,0 +1,72 @@
+from Interpreter import *
+from LoxFunction import *
+from ProfilingInterpreter import firstLine
+from VM import VM
+import signal
+import time
+
+class SamplingProfiler:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.samples = 0
+        self.selfSamples = {}
+        self.totalSamples = {}
+        self.lineSamples = {}
+        self.nodeLines = {}
+        self.callCode = LoxFunction.call.__code__
+        self.vmCode = VM.run.__code__
+        self.visitorCodes = set(getattr(Interpreter, name).__code__ for name in dir(Interpreter) if name.startswith("visit"))
+        self.cpuTime = 0.0
+    def start(self):
+        self.cpuTime = time.process_time()
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        self.cpuTime = time.process_time() - self.cpuTime
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+    def sample(self, signum, frame):
+        self.samples += 1
+        functions = []
+        line = None
+        while frame is not None:
+            code = frame.f_code
+            if code is self.callCode:
+                locals = frame.f_locals
+                functions.append(self.functionName(locals.get("function", locals["self"])))
+            elif line is None and code in self.visitorCodes:
+                locals = frame.f_locals
+                line = self.nodeLine(locals["expr"] if "expr" in locals else locals["stmt"])
+            elif code is self.vmCode:
+                locals = frame.f_locals
+                if "ip" in locals:
+                    ip, tokens = locals["ip"], locals["tokens"]
+                    if line is None and ip > 0 and tokens[ip-1] is not None:
+                        line = tokens[ip-1].line
+                    closures = [locals["closure"]] + [closure for closure, ip, base in reversed(locals["frames"])]
+                    functions.extend(closure.function.name for closure in closures if closure.function.name != None)
+            frame = frame.f_back
+        name = functions[0] if len(functions) > 0 else "<script>"
+        self.selfSamples[name] = self.selfSamples.get(name, 0) + 1
+        for name in set(functions) or ["<script>"]:
+            self.totalSamples[name] = self.totalSamples.get(name, 0) + 1
+        if line is not None:
+            self.lineSamples[line] = self.lineSamples.get(line, 0) + 1
+    def functionName(self, function):
+        declaration = function.declaration
+        return f"{declaration.name.lexeme} (line {declaration.name.line})"
+    def nodeLine(self, node):
+        line = self.nodeLines.get(node)
+        if line == None:
+            line = self.nodeLines[node] = firstLine(node)
+        return line
+    def report(self, file):
+        samples = max(self.samples, 1)
+        print(f"Samples: {self.samples} over {self.cpuTime:.3f}s CPU (requested interval {self.interval * 1000:g} ms)", file=file)
+        print(f"{'self':>8} {'self %':>7} {'total':>8} {'total %':>8}  function", file=file)
+        for name, total in sorted(self.totalSamples.items(), key=lambda item: (-self.selfSamples.get(item[0], 0), -item[1])):
+            count = self.selfSamples.get(name, 0)
+            print(f"{count:>8} {count / samples * 100:>6.1f}% {total:>8} {total / samples * 100:>7.1f}%  {name}", file=file)
+        print(f"{'samples':>8} {'%':>7}  line", file=file)
+        for line, count in sorted(self.lineSamples.items(), key=lambda item: -item[1]):
+            print(f"{count:>8} {count / samples * 100:>6.1f}%  line {line}", file=file)
@@ -1,101 +1,86 @@
 from Token import Token
+from TokenType import *
+import gc
+import re
+import sys
 
 class Scanner:
-    keywords = [
-        "and", "class", "else", "false",
-        "for", "fun", "if", "nil",
-        "or", "print", "return", "super",
-        "this", "true", "var", "while",
-    ]
+    keywords = {
+        "and": TokenType.AND, "class": TokenType.CLASS, "else": TokenType.ELSE, "false": TokenType.FALSE,
+        "for": TokenType.FOR, "fun": TokenType.FUN, "if": TokenType.IF, "nil": TokenType.NIL,
+        "or": TokenType.OR, "print": TokenType.PRINT, "return": TokenType.RETURN, "super": TokenType.SUPER,
+        "this": TokenType.THIS, "true": TokenType.TRUE, "var": TokenType.VAR, "while": TokenType.WHILE,
+    }
+    operators = {
+        '(': TokenType.LEFT_PAREN, ')': TokenType.RIGHT_PAREN, '{': TokenType.LEFT_BRACE, '}': TokenType.RIGHT_BRACE,
+        ',': TokenType.COMMA, '.': TokenType.DOT, '-': TokenType.MINUS, '+': TokenType.PLUS,
+        ';': TokenType.SEMICOLON, '/': TokenType.SLASH, '*': TokenType.STAR, '%': TokenType.MODULO,
+        '!': TokenType.BANG, '!=': TokenType.BANG_EQUAL, '=': TokenType.EQUAL, '==': TokenType.EQUAL_EQUAL,
+        '>': TokenType.GREATER, '>=': TokenType.GREATER_EQUAL, '<': TokenType.LESS, '<=': TokenType.LESS_EQUAL,
+    }
+    pattern = re.compile(r'''
+        (?P<space>[ \t\r\n]*)
+        (?:
+            (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+          | (?P<operator>[!=<>]=?|[(){},.\-+;*%]|/(?!/))
+          | (?P<number>[0-9]+(?:\.[0-9]+)?)
+          | (?P<comment>//[^\n]*)
+          | (?P<string>"[^"]*")
+          | (?P<unterminated>"[^"]*)
+          | (?P<end>\Z)
+          | (?P<error>.)
+        )
+    ''', re.VERBOSE)
+    IDENTIFIER = pattern.groupindex["identifier"]
+    OPERATOR = pattern.groupindex["operator"]
+    NUMBER = pattern.groupindex["number"]
+    COMMENT = pattern.groupindex["comment"]
+    STRING = pattern.groupindex["string"]
+    UNTERMINATED = pattern.groupindex["unterminated"]
+    END = pattern.groupindex["end"]
     def __init__(self, source, Lox):
         self.source = source
         self.tokens = []
-        self.start = 0
-        self.current = 0
         self.line = 1
         self.lox_class = Lox
     def scanTokens(self):
-        while not self.isAtEnd():
-            self.start = self.current
-            self.scanToken()
-        self.tokens.append(Token("EOF", "", None, self.line))
-        return self.tokens
-    def isAtEnd(self):
-        return self.current >= len(self.source)
-    def scanToken(self):
-        c = self.advance()
-        if c == '(': self.addSingleToken("LEFT_PAREN")
-        elif c == ')': self.addSingleToken("RIGHT_PAREN")
-        elif c == '{': self.addSingleToken("LEFT_BRACE")
-        elif c == '}': self.addSingleToken("RIGHT_BRACE")
-        elif c == ',': self.addSingleToken("COMMA")
-        elif c == '.': self.addSingleToken("DOT")
-        elif c == '-': self.addSingleToken("MINUS")
-        elif c == '+': self.addSingleToken("PLUS")
-        elif c == ';': self.addSingleToken("SEMICOLON")
-        elif c == '*': self.addSingleToken("STAR")
-        elif c == '%': self.addSingleToken("MODULO")
-        elif c == '!': self.addSingleToken("BANG_EQUAL" if self.match('=') else "BANG")
-        elif c == '=': self.addSingleToken("EQUAL_EQUAL" if self.match('=') else "EQUAL")
-        elif c == '<': self.addSingleToken("LESS_EQUAL" if self.match('=') else "LESS")
-        elif c == '>': self.addSingleToken("GREATER_EQUAL" if self.match('=') else "GREATER")
-        elif c == '/':
-            if self.match('/'):
-                while self.peek() != "\n" and not self.isAtEnd(): self.advance()
-            else:
-                self.addSingleToken("SLASH")
-        elif c == '"': self.string()
-        elif self.isDigit(c): self.number()
-        elif self.isAlpha(c): self.identifier()
-        elif c in [' ', "\r", "\t"]: pass
-        elif c == "\n": self.line += 1
-        else: self.lox_class.error(self.line, f"Unexpected character ({c}).")
-    def advance(self):
-        self.current += 1
-        return self.source[self.current-1]
-    def addSingleToken(self, type):
-        self.addToken(type,None)
-    def addToken(self, type, literal):
-        text = self.source[self.start:self.current]
-        self.tokens.append(Token(type, text, literal, self.line))
-    def match(self, char):
-        if self.isAtEnd(): return False
-        if self.source[self.current] != char: return False
-        self.current += 1
-        return True
-    def peek(self):
-        if self.isAtEnd(): return "\0"
-        return self.source[self.current]
-    def peekNext(self):
-        if self.current + 1 > len(self.source): return "\0"
-        return self.source[self.current+1]
-    def string(self):
-        while self.peek() != '"' and not self.isAtEnd():
-            if self.peek() == "\n": self.line += 1
-            self.advance()
-        if self.isAtEnd():
-            self.lox_class.error(self.line, "Unterminated string.")
-            return
-        self.advance()
-        value = self.source[self.start+1 : self.current-1]
-        self.addToken("STRING", value)
-    def isDigit(self, char):
-        return char <= "9" and char >= "0"
-    def number(self):
-        while self.isDigit(self.peek()): self.advance()
-        if self.peek() == '.' and self.isDigit(self.peekNext()):
-            self.advance()
-            while self.isDigit(self.peek()): self.advance()
-        num = float(self.source[self.start : self.current])
-        self.addToken("NUMBER", num)
-    def isAlpha(self, char):
-        return (char >= 'a' and char <= 'z') or (char >= 'A' and char <= 'Z') or (char == '_')
-    def isAlphaNumeric(self, char):
-        return self.isDigit(char) or self.isAlpha(char)
-    def identifier(self):
-        while self.isAlphaNumeric(self.peek()): self.advance()
-        text = self.source[self.start : self.current]
-        if text in self.keywords:
-            self.addSingleToken(text.upper())
-            return
-        self.addToken("IDENTIFIER", text)
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            self.tokens.extend(self.scan())
+            return self.tokens
+        finally:
+            if collecting: gc.enable()
+    def scan(self):
+        keywords = self.keywords
+        operators = self.operators
+        IDENTIFIER, OPERATOR, NUMBER, STRING = self.IDENTIFIER, self.OPERATOR, self.NUMBER, self.STRING
+        identifierType, numberType, stringType = TokenType.IDENTIFIER, TokenType.NUMBER, TokenType.STRING
+        intern, span = sys.intern, Token.span
+        source = self.source
+        line = self.line
+        for match in self.pattern.finditer(source):
+            kind = match.lastindex
+            space, text = match.group(1, kind)
+            if "\n" in space:
+                line += space.count("\n")
+            if kind == IDENTIFIER:
+                text = intern(text)
+                if text in keywords:
+                    yield Token(keywords[text], text, None, line)
+                else:
+                    yield Token(identifierType, text, text, line)
+            elif kind == OPERATOR:
+                yield Token(operators[text], intern(text), None, line)
+            elif kind == NUMBER:
+                yield span(numberType, source, match.start(kind), match.end(kind), float(text), line)
+            elif kind == STRING:
+                line += text.count("\n")
+                yield span(stringType, source, match.start(kind), match.end(kind), text[1:-1], line)
+            elif kind == self.UNTERMINATED:
+                line += text.count("\n")
+                self.lox_class.error(line, "Unterminated string.")
+            elif kind != self.COMMENT and kind != self.END:
+                self.lox_class.error(line, f"Unexpected character ({text}).")
+        self.line = line
+        yield Token(TokenType.EOF, "", None, line)
@@ -0,0 +1,11 @@
+class Shape:
+    def __init__(self, klass, slots):
+        self.klass = klass
+        self.slots = slots
+        self.transitions = {}
+    def withField(self, name):
+        if name not in self.transitions.keys():
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            self.transitions[name] = Shape(self.klass, slots)
+        return self.transitions[name]
@@ -0,0 +1,83 @@
+from Expr import Binary
+from TokenType import *
+
+class GenericBinary(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitGenericBinaryExpr(self)
+class NumberAdd(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberAddExpr(self)
+class StringAdd(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitStringAddExpr(self)
+class NumberSubtract(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberSubtractExpr(self)
+class NumberMultiply(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberMultiplyExpr(self)
+class NumberDivide(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberDivideExpr(self)
+class NumberModulo(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberModuloExpr(self)
+class NumberGreater(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberGreaterExpr(self)
+class NumberGreaterEqual(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberGreaterEqualExpr(self)
+class NumberLess(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberLessExpr(self)
+class NumberLessEqual(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNumberLessEqualExpr(self)
+class Equal(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitEqualExpr(self)
+class NotEqual(Binary):
+    __slots__ = ()
+    def accept(self, visitor):
+        return visitor.visitNotEqualExpr(self)
+
+numberSpecializations = {
+    TokenType.PLUS: NumberAdd,
+    TokenType.MINUS: NumberSubtract,
+    TokenType.STAR: NumberMultiply,
+    TokenType.SLASH: NumberDivide,
+    TokenType.MODULO: NumberModulo,
+    TokenType.GREATER: NumberGreater,
+    TokenType.GREATER_EQUAL: NumberGreaterEqual,
+    TokenType.LESS: NumberLess,
+    TokenType.LESS_EQUAL: NumberLessEqual,
+}
+
+def specialize(expr, left, right):
+    operator = expr.operator.type
+    if operator == TokenType.EQUAL_EQUAL:
+        expr.__class__ = Equal
+    elif operator == TokenType.BANG_EQUAL:
+        expr.__class__ = NotEqual
+    elif type(left) is float and type(right) is float:
+        expr.__class__ = numberSpecializations.get(operator, GenericBinary)
+    elif operator == TokenType.PLUS and type(left) is str and type(right) is str:
+        expr.__class__ = StringAdd
+    else:
+        expr.__class__ = GenericBinary
+
+def generalize(expr):
+    expr.__class__ = GenericBinary
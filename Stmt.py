@@ -1,28 +1,37 @@
 class Block:
+    __slots__ = ("statements", "location")
     def __init__(self, statements):
         self.statements = statements
+        self.location = None
     def accept(self, visitor):
         return visitor.visitBlockStmt(self)
 class Class:
+    __slots__ = ("name", "superclass", "methods", "location")
     def __init__(self, name, superclass, methods):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        self.location = None
     def accept(self, visitor):
         return visitor.visitClassStmt(self)
 class Expression:
+    __slots__ = ("expression",)
     def __init__(self, expression):
         self.expression = expression
     def accept(self, visitor):
         return visitor.visitExpressionStmt(self)
 class Function:
+    __slots__ = ("name", "params", "body", "tier", "location")
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
         self.body = body
+        self.tier = None
+        self.location = None
     def accept(self, visitor):
         return visitor.visitFunctionStmt(self)
 class If:
+    __slots__ = ("condition", "thenBranch", "elseBranch")
     def __init__(self, condition, thenBranch, elseBranch):
         self.condition = condition
         self.thenBranch = thenBranch
@@ -30,23 +39,29 @@ class If:
     def accept(self, visitor):
         return visitor.visitIfStmt(self)
 class Print:
-    def __init__(self, expression):
+    __slots__ = ("keyword", "expression")
+    def __init__(self, keyword, expression):
+        self.keyword = keyword
         self.expression = expression
     def accept(self, visitor):
         return visitor.visitPrintStmt(self)
 class Return:
+    __slots__ = ("keyword", "value")
     def __init__(self, keyword, value):
         self.keyword = keyword
         self.value = value
     def accept(self, visitor):
         return visitor.visitReturnStmt(self)
 class Var:
+    __slots__ = ("name", "initialiser", "location")
     def __init__(self, name, initialiser):
         self.name = name
         self.initialiser = initialiser
+        self.location = None
     def accept(self, visitor):
         return visitor.visitVarStmt(self)
 class While:
+    __slots__ = ("condition", "body")
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
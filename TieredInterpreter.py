@@ -0,0 +1,101 @@
+from Interpreter import *
+from ClosureCompiler import *
+import queue
+import threading
+import time
+
+TIER_THRESHOLD = 100
+
+class TierState:
+    def __init__(self, declaration):
+        self.declaration = declaration
+        self.calls = 0
+        self.backEdges = 0
+        self.compiledCalls = 0
+        self.body = None
+        self.queued = None
+        self.compileTime = None
+        self.ready = None
+
+class TieredFunction(LoxFunction):
+    def call(self, interpreter, arguments):
+        if interpreter.depth >= interpreter.maxDepth: raise RecursionError
+        interpreter.depth += 1
+        try:
+            function = self
+            while True:
+                state = function.declaration.tier
+                if state is None:
+                    state = function.declaration.tier = TierState(function.declaration)
+                if function.boxed: function.box(arguments)
+                body = state.body
+                if body is not None:
+                    state.compiledCalls += 1
+                    result = body(Environment(function.closure, arguments))
+                else:
+                    state.calls += 1
+                    if state.calls + state.backEdges == interpreter.threshold:
+                        interpreter.promote(state)
+                    previous = interpreter.function
+                    interpreter.function = state
+                    try:
+                        result = interpreter.executeBlock(function.declaration.body, Environment(function.closure, arguments))
+                    finally:
+                        interpreter.function = previous
+                if function.isInitialiser: return arguments[0]
+                if result is None: return None
+                if len(result) == 1: return result[0]
+                function, arguments = result[1], result[2]
+        finally:
+            interpreter.depth -= 1
+
+class TieredInterpreter(Interpreter):
+    functionType = TieredFunction
+    def __init__(self, lox):
+        super().__init__(lox)
+        self.threshold = TIER_THRESHOLD
+        self.function = None
+        self.promoted = []
+        self.queue = None
+    def visitWhileStmt(self, stmt):
+        state = self.function
+        frame = self.loopFrame(stmt.body)
+        if frame is not None:
+            environment = Environment(self.environment)
+        while self.isTruthy(self.evaluate(stmt.condition)):
+            if frame is None:
+                result = stmt.body.accept(self)
+            else:
+                result = self.iterate(environment, frame)
+            if result is not None: return result
+            if state is not None:
+                state.backEdges += 1
+                if state.calls + state.backEdges == self.threshold:
+                    self.promote(state)
+        return None
+    def promote(self, state):
+        if self.queue == None:
+            self.queue = queue.Queue()
+            threading.Thread(target=self.compileQueued, daemon=True).start()
+        state.queued = time.perf_counter()
+        self.promoted.append(state)
+        self.queue.put(state)
+    def compileQueued(self):
+        while True:
+            state = self.queue.get()
+            start = time.perf_counter()
+            body = ClosureCompiler(self, TieredFunction).compileFunction(state.declaration)
+            state.ready = time.perf_counter()
+            state.compileTime = state.ready - start
+            state.body = body
+    def report(self, file):
+        print(f"Tiered execution: {len(self.promoted)} functions promoted (threshold {self.threshold})", file=file)
+        print(f"{'calls':>10} {'loops':>10} {'compiled':>10} {'compile (ms)':>13} {'ready (ms)':>11}  function", file=file)
+        for state in self.promoted:
+            declaration = state.declaration
+            if state.ready == None:
+                compileTime = ready = "pending"
+            else:
+                compileTime = f"{state.compileTime * 1000:.2f}"
+                ready = f"{(state.ready - state.queued) * 1000:.2f}"
+            print(f"{state.calls:>10} {state.backEdges:>10} {state.compiledCalls:>10} {compileTime:>13} {ready:>11}  {declaration.name.lexeme} (line {declaration.name.line})", file=file)
@@ -1,10 +1,25 @@
 from TokenType import *
 
 class Token:
+    __slots__ = ("type", "lexeme", "literal", "line", "source", "start", "end")
     def __init__(self, type, lexeme, literal, line):
         self.type = type
         self.lexeme = lexeme
         self.literal = literal
         self.line = line
+    @classmethod
+    def span(cls, type, source, start, end, literal, line):
+        token = cls.__new__(cls)
+        token.type = type
+        token.literal = literal
+        token.line = line
+        token.source = source
+        token.start = start
+        token.end = end
+        return token
+    def __getattr__(self, name):
+        if name != "lexeme": raise AttributeError(name)
+        self.lexeme = self.source[self.start:self.end]
+        return self.lexeme
     def __repr__(self):
-        return f"{self.type} {self.lexeme} {self.literal}"
+        return f"{self.type.name} {self.lexeme} {self.literal}"
@@ -1,21 +1,51 @@
-TokenType = [
-    "LEFT_PAREN", "RIGHT_PAREN", "LEFT_BRACE", "RIGHT_BRACE",
-    "COMMA", "DOT", "MINUS", "PLUS", "SEMICOLON", "SLASH", "STAR",
-    "MODULO",
+from enum import IntEnum
+
+class TokenType(IntEnum):
+    LEFT_PAREN = 0
+    RIGHT_PAREN = 1
+    LEFT_BRACE = 2
+    RIGHT_BRACE = 3
+    COMMA = 4
+    DOT = 5
+    MINUS = 6
+    PLUS = 7
+    SEMICOLON = 8
+    SLASH = 9
+    STAR = 10
+    MODULO = 11
 
     # One or two character tokens.
-    "BANG", "BANG_EQUAL",
-    "EQUAL", "EQUAL_EQUAL",
-    "GREATER", "GREATER_EQUAL",
-    "LESS", "LESS_EQUAL",
+    BANG = 12
+    BANG_EQUAL = 13
+    EQUAL = 14
+    EQUAL_EQUAL = 15
+    GREATER = 16
+    GREATER_EQUAL = 17
+    LESS = 18
+    LESS_EQUAL = 19
 
     # Literals.
-    "IDENTIFIER", "STRING", "NUMBER",
+    IDENTIFIER = 20
+    STRING = 21
+    NUMBER = 22
 
     # Keywords.
-    "AND", "CLASS", "ELSE", "FALSE", "FUN", "FOR", "IF", "NIL", "OR",
-    "PRINT", "RETURN", "SUPER", "THIS", "TRUE", "VAR", "WHILE",
-    
+    AND = 23
+    CLASS = 24
+    ELSE = 25
+    FALSE = 26
+    FUN = 27
+    FOR = 28
+    IF = 29
+    NIL = 30
+    OR = 31
+    PRINT = 32
+    RETURN = 33
+    SUPER = 34
+    THIS = 35
+    TRUE = 36
+    VAR = 37
+    WHILE = 38
+
     # EOF
-    "EOF"
-]
+    EOF = 39
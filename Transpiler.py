@@ -0,0 +1,536 @@
+from Token import Token
+from LoxRuntimeError import *
+from LoxClass import *
+from Expr import *
+from TokenType import *
+from Stmt import Block, If
+from Interpreter import Clock, Input, Print
+import types
+
+class Cell:
+    def __init__(self, v):
+        self.v = v
+
+class TranspiledFunction(LoxCallable):
+    def __init__(self, fn, paramCount, name, isInitialiser):
+        self.fn = fn
+        self.paramCount = paramCount
+        self.name = name
+        self.isInitialiser = isInitialiser
+        self.arity = paramCount
+    def call(self, interpreter, arguments):
+        return self.fn(*arguments)
+    def bind(self, instance):
+        return TranspiledFunction(types.MethodType(self.fn, instance), self.paramCount, self.name, self.isInitialiser)
+    def __repr__(self):
+        return f"<fn {self.name}>"
+
+def _call(callee, token, *arguments):
+    if not isinstance(callee, LoxCallable):
+        raise LoxRuntimeError(token, "Can only call functions and classes.")
+    if len(arguments) != callee.arity:
+        raise LoxRuntimeError(token, f"Expected {callee.arity} arguments but got {len(arguments)}.")
+    return callee.call(None, list(arguments))
+def _get(instance, token):
+    if type(instance) is LoxInstance:
+        return instance.get(token)
+    raise LoxRuntimeError(token, "Only instances have properties.")
+def _instance(instance, token):
+    if type(instance) is not LoxInstance:
+        raise LoxRuntimeError(token, "Only instances have fields.")
+    return instance
+def _set(instance, token, value):
+    instance.set(token, value)
+    return value
+def _super(superclass, instance, token):
+    method = superclass.findMethod(token.lexeme)
+    if method == None:
+        raise LoxRuntimeError(token, f"Undefined property '{token.lexeme}'.")
+    return method.bind(instance)
+def _superclass(superclass, token):
+    if type(superclass) is not LoxClass:
+        raise LoxRuntimeError(token, "Superclass must be a class.")
+    return superclass
+def _setGlobal(namespace, name, value, token):
+    if name not in namespace:
+        raise LoxRuntimeError(token, f"Undefined variable '{token.lexeme}'.")
+    namespace[name] = value
+    return value
+def _cellSet(cell, value):
+    cell.v = value
+    return value
+def _numberError(token):
+    raise LoxRuntimeError(token, "Operands must be numbers.")
+def _negateError(token):
+    raise LoxRuntimeError(token, "Operand should be a number.")
+def _addError(token):
+    raise LoxRuntimeError(token, "Operands must be two numbers or two strigns.")
+def _divideError(left, right, token):
+    if type(left) is not float or type(right) is not float:
+        raise LoxRuntimeError(token, "Operands must be numbers.")
+    raise LoxRuntimeError(token, "You can't divide by 0")
+
+class VarInfo:
+    def __init__(self, name, function, inLoop):
+        self.name = name
+        self.function = function
+        self.inLoop = inLoop
+        self.boxed = False
+
+class FunctionInfo:
+    def __init__(self, enclosing):
+        self.enclosing = enclosing
+        self.loopDepth = 0
+        self.freeCells = []
+        self.nonlocals = []
+
+class ScopeAnalyser:
+    def __init__(self):
+        self.scopes = []
+        self.function = FunctionInfo(None)
+        self.declarations = {}
+        self.bindings = {}
+        self.functions = {}
+        self.superclasses = {}
+        self.counter = 0
+    def analyse(self, statements):
+        self.resolve(statements)
+        return self.function
+    def resolve(self, node):
+        if type(node) == list:
+            for statement in node:
+                self.resolve(statement)
+        elif node != None:
+            node.accept(self)
+    def declare(self, token):
+        if len(self.scopes) == 0: return
+        self.counter += 1
+        info = VarInfo(f"l_{token.lexeme}_{self.counter}", self.function, self.function.loopDepth > 0)
+        self.scopes[-1][token.lexeme] = info
+        self.declarations[token] = info
+    def bind(self, expr, name, assign=False):
+        if expr.location == None: return
+        for scope in reversed(self.scopes):
+            if name in scope: break
+        info = scope[name]
+        self.bindings[expr] = info
+        function = self.function
+        if info.function == function: return
+        if info.inLoop:
+            info.boxed = True
+            while function != info.function:
+                if info not in function.freeCells: function.freeCells.append(info)
+                function = function.enclosing
+        elif assign and info not in function.nonlocals:
+            function.nonlocals.append(info)
+    def resolveFunction(self, declaration, isMethod):
+        function = FunctionInfo(self.function)
+        self.functions[declaration] = function
+        self.function = function
+        self.scopes.append({})
+        if isMethod:
+            self.scopes[-1]["this"] = VarInfo("this", function, False)
+        for param in declaration.params:
+            self.declare(param)
+        self.resolve(declaration.body)
+        self.scopes.pop()
+        self.function = function.enclosing
+    def visitBlockStmt(self, stmt):
+        self.scopes.append({})
+        self.resolve(stmt.statements)
+        self.scopes.pop()
+    def visitVarStmt(self, stmt):
+        self.declare(stmt.name)
+        self.resolve(stmt.initialiser)
+    def visitFunctionStmt(self, stmt):
+        self.declare(stmt.name)
+        self.resolveFunction(stmt, False)
+    def visitClassStmt(self, stmt):
+        self.declare(stmt.name)
+        self.resolve(stmt.superclass)
+        if stmt.superclass != None:
+            self.counter += 1
+            info = VarInfo(f"l_super_{self.counter}", self.function, self.function.loopDepth > 0)
+            self.superclasses[stmt] = info
+            self.scopes.append({"super": info})
+        for method in stmt.methods:
+            self.resolveFunction(method, True)
+        if stmt.superclass != None: self.scopes.pop()
+    def visitExpressionStmt(self, stmt):
+        self.resolve(stmt.expression)
+    def visitIfStmt(self, stmt):
+        self.resolve(stmt.condition)
+        self.resolve(stmt.thenBranch)
+        self.resolve(stmt.elseBranch)
+    def visitPrintStmt(self, stmt):
+        self.resolve(stmt.expression)
+    def visitReturnStmt(self, stmt):
+        self.resolve(stmt.value)
+    def visitWhileStmt(self, stmt):
+        self.resolve(stmt.condition)
+        self.function.loopDepth += 1
+        self.resolve(stmt.body)
+        self.function.loopDepth -= 1
+    def visitAssignExpr(self, expr):
+        self.resolve(expr.value)
+        self.bind(expr, expr.name.lexeme, True)
+    def visitBinaryExpr(self, expr):
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+    def visitCallExpr(self, expr):
+        self.resolve(expr.callee)
+        self.resolve(expr.arguments)
+    def visitGetExpr(self, expr):
+        self.resolve(expr.object)
+    def visitGroupingExpr(self, expr):
+        self.resolve(expr.expression)
+    def visitLiteralExpr(self, expr):
+        pass
+    def visitLogicalExpr(self, expr):
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+    def visitSetExpr(self, expr):
+        self.resolve(expr.object)
+        self.resolve(expr.value)
+    def visitSuperExpr(self, expr):
+        self.bind(expr, "super")
+    def visitThisExpr(self, expr):
+        self.bind(expr, "this")
+    def visitUnaryExpr(self, expr):
+        self.resolve(expr.right)
+    def visitVariableExpr(self, expr):
+        self.bind(expr, expr.name.lexeme)
+
+class Transpiler:
+    programs = 0
+    def __init__(self, lox):
+        self.lox_class = lox
+        self.sources = {}
+        self.namespace = {
+            "__builtins__": __builtins__,
+            "LoxClass": LoxClass,
+            "_Fn": TranspiledFunction,
+            "_Cell": Cell,
+            "_call": _call,
+            "_get": _get,
+            "_instance": _instance,
+            "_set": _set,
+            "_super": _super,
+            "_superclass": _superclass,
+            "_setGlobal": _setGlobal,
+            "_cellSet": _cellSet,
+            "_numberError": _numberError,
+            "_negateError": _negateError,
+            "_addError": _addError,
+            "_divideError": _divideError,
+            "_stringify": lox.interpreter.stringify,
+            "_D": lox.interpreter,
+            "g_clock": Clock(),
+            "g_input": Input(),
+            "g_print": Print(),
+        }
+        self.namespace["_G"] = self.namespace
+    def transpile(self, statements):
+        Transpiler.programs += 1
+        self.program = Transpiler.programs
+        analyser = ScopeAnalyser()
+        self.main = analyser.analyse(statements)
+        self.declarations = analyser.declarations
+        self.bindings = analyser.bindings
+        self.functions = analyser.functions
+        self.superclasses = analyser.superclasses
+        self.tokens = []
+        self.tokenIndex = {}
+        self.lines = []
+        self.lineMap = []
+        self.line = 0
+        self.indent = 1
+        self.temps = 0
+        self.function = self.main
+        self.initialiser = False
+        self.globalNames = []
+        for statement in statements:
+            statement.accept(self)
+        if len(self.lines) == 0:
+            self.emit("pass")
+        header = [f"def _main_{self.program}():"]
+        if len(self.globalNames) > 0:
+            header.append("    global " + ", ".join(self.globalNames))
+        self.lineMap = [0] * len(header) + self.lineMap
+        return "\n".join(header + self.lines) + "\n"
+    def run(self, source):
+        filename = f"<lox-{self.program}>"
+        self.sources[filename] = (self.lineMap, self.tokens)
+        self.namespace[f"_T{self.program}"] = self.tokens
+        try:
+            exec(compile(source, filename, "exec"), self.namespace)
+            self.namespace[f"_main_{self.program}"]()
+        except LoxRuntimeError as e:
+            self.lox_class.runtimeError(e)
+        except NameError as e:
+            self.lox_class.runtimeError(self.undefinedVariable(e))
+        except RecursionError as e:
+            self.lox_class.runtimeError(LoxRuntimeError(Token(TokenType.IDENTIFIER, "", None, self.errorLine(e)), "Stack overflow."))
+    def undefinedVariable(self, error):
+        name = error.name[2:]
+        return LoxRuntimeError(Token(TokenType.IDENTIFIER, name, None, self.errorLine(error)), f"Undefined variable '{name}'.")
+    def errorLine(self, error):
+        line = 0
+        traceback = error.__traceback__
+        while traceback != None:
+            code = traceback.tb_frame.f_code
+            if code.co_filename in self.sources:
+                lineMap = self.sources[code.co_filename][0]
+                line = lineMap[traceback.tb_lineno - 1]
+            traceback = traceback.tb_next
+        return line
+    def emit(self, line):
+        self.lines.append("    " * self.indent + line)
+        self.lineMap.append(self.line)
+    def token(self, token):
+        self.line = token.line
+        if id(token) not in self.tokenIndex:
+            self.tokenIndex[id(token)] = len(self.tokens)
+            self.tokens.append(token)
+        return f"_T{self.program}[{self.tokenIndex[id(token)]}]"
+    def temp(self):
+        self.temps += 1
+        return f"_t{self.temps}"
+    def block(self, statements):
+        start = len(self.lines)
+        for statement in statements:
+            statement.accept(self)
+        if len(self.lines) == start:
+            self.emit("pass")
+    def nested(self, stmt):
+        self.indent += 1
+        if type(stmt) == Block:
+            self.block(stmt.statements)
+        else:
+            self.block([stmt])
+        self.indent -= 1
+    def condition(self, expr):
+        if type(expr) == Binary and expr.operator.type in comparisonOperators:
+            return self.expression(expr)
+        if type(expr) == Unary and expr.operator.type == TokenType.BANG:
+            return self.expression(expr)
+        if type(expr) == Literal:
+            return "True" if expr.value is not None and expr.value != 0 else "False"
+        value = self.temp()
+        return f"(({value} := {self.expression(expr)}) is not None and {value} != 0)"
+    def expression(self, expr):
+        return expr.accept(self)
+    def declared(self, token):
+        info = self.declarations.get(token)
+        if info == None:
+            name = "g_" + token.lexeme
+            if name not in self.globalNames: self.globalNames.append(name)
+        return info
+    def define(self, token, value):
+        info = self.declared(token)
+        if info == None:
+            self.emit(f"g_{token.lexeme} = {value}")
+        elif info.boxed:
+            self.emit(f"{info.name} = _Cell({value})")
+        else:
+            self.emit(f"{info.name} = {value}")
+    def emitFunction(self, declaration, name, parameters, isInitialiser):
+        info = self.functions[declaration]
+        enclosingFunction, enclosingInitialiser, enclosingTemps = self.function, self.initialiser, self.temps
+        self.function, self.initialiser, self.temps = info, isInitialiser, 0
+        parameters = parameters + [self.declarations[param].name for param in declaration.params]
+        if len(info.freeCells) > 0:
+            parameters += ["*"] + [f"{cell.name}={cell.name}" for cell in info.freeCells]
+        self.emit(f"def {name}({', '.join(parameters)}):")
+        self.indent += 1
+        if len(info.nonlocals) > 0:
+            self.emit("nonlocal " + ", ".join(variable.name for variable in info.nonlocals))
+        self.emit("if _D.depth >= _D.maxDepth: raise RecursionError")
+        self.emit("_D.depth += 1")
+        self.emit("try:")
+        self.indent += 1
+        self.block(declaration.body)
+        if self.initialiser: self.emit("return this")
+        self.indent -= 1
+        self.emit("finally:")
+        self.emit("    _D.depth -= 1")
+        self.indent -= 1
+        self.function, self.initialiser, self.temps = enclosingFunction, enclosingInitialiser, enclosingTemps
+    def visitBlockStmt(self, stmt):
+        self.block(stmt.statements)
+    def visitVarStmt(self, stmt):
+        self.line = stmt.name.line
+        value = "None"
+        if stmt.initialiser != None:
+            value = self.expression(stmt.initialiser)
+        self.define(stmt.name, value)
+    def visitFunctionStmt(self, stmt):
+        self.line = stmt.name.line
+        info = self.declared(stmt.name)
+        name = f"_f_{stmt.name.lexeme}_{len(self.lines)}"
+        if info != None and info.boxed:
+            self.emit(f"{info.name} = _Cell(None)")
+        self.emitFunction(stmt, name, [], False)
+        value = f"_Fn({name}, {len(stmt.params)}, {stmt.name.lexeme!r}, False)"
+        if info == None:
+            self.emit(f"g_{stmt.name.lexeme} = {value}")
+        elif info.boxed:
+            self.emit(f"{info.name}.v = {value}")
+        else:
+            self.emit(f"{info.name} = {value}")
+    def visitClassStmt(self, stmt):
+        self.line = stmt.name.line
+        superclass = "None"
+        if stmt.superclass != None:
+            superclass = self.temp()
+            self.emit(f"{superclass} = _superclass({self.expression(stmt.superclass)}, {self.token(stmt.superclass.name)})")
+        self.define(stmt.name, "None")
+        if stmt.superclass != None:
+            info = self.superclasses[stmt]
+            if info.boxed:
+                self.emit(f"{info.name} = _Cell({superclass})")
+            else:
+                self.emit(f"{info.name} = {superclass}")
+        methods = []
+        for method in stmt.methods:
+            name = f"_m_{method.name.lexeme}_{len(self.lines)}"
+            self.line = method.name.line
+            isInitialiser = method.name.lexeme == "init"
+            self.emitFunction(method, name, ["this"], isInitialiser)
+            methods.append(f"{method.name.lexeme!r}: _Fn({name}, {len(method.params)}, {method.name.lexeme!r}, {isInitialiser})")
+        klass = f"LoxClass({stmt.name.lexeme!r}, {superclass}, {{{', '.join(methods)}}})"
+        info = self.declarations.get(stmt.name)
+        if info == None:
+            self.emit(f"g_{stmt.name.lexeme} = {klass}")
+        elif info.boxed:
+            self.emit(f"{info.name}.v = {klass}")
+        else:
+            self.emit(f"{info.name} = {klass}")
+    def visitExpressionStmt(self, stmt):
+        expr = stmt.expression
+        if type(expr) == Assign and self.bindings.get(expr) != None:
+            info = self.bindings[expr]
+            value = self.expression(expr.value)
+            if info.boxed:
+                self.emit(f"{info.name}.v = {value}")
+            else:
+                self.emit(f"{info.name} = {value}")
+            return
+        self.emit(self.expression(expr))
+    def visitPrintStmt(self, stmt):
+        self.emit(f"print(_stringify({self.expression(stmt.expression)}))")
+    def visitReturnStmt(self, stmt):
+        self.line = stmt.keyword.line
+        if self.initialiser:
+            self.emit("return this")
+        elif stmt.value == None:
+            self.emit("return None")
+        else:
+            self.emit(f"return {self.expression(stmt.value)}")
+    def visitIfStmt(self, stmt):
+        keyword = "if"
+        while True:
+            self.emit(f"{keyword} {self.condition(stmt.condition)}:")
+            self.nested(stmt.thenBranch)
+            if type(stmt.elseBranch) != If: break
+            stmt = stmt.elseBranch
+            keyword = "elif"
+        if stmt.elseBranch != None:
+            self.emit("else:")
+            self.nested(stmt.elseBranch)
+    def visitWhileStmt(self, stmt):
+        self.emit(f"while {self.condition(stmt.condition)}:")
+        self.nested(stmt.body)
+    def visitAssignExpr(self, expr):
+        self.line = expr.name.line
+        value = self.expression(expr.value)
+        info = self.bindings.get(expr)
+        if info == None:
+            return f"_setGlobal(_G, 'g_{expr.name.lexeme}', {value}, {self.token(expr.name)})"
+        if info.boxed:
+            return f"_cellSet({info.name}, {value})"
+        return f"({info.name} := {value})"
+    def visitBinaryExpr(self, expr):
+        operator = expr.operator.type
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        token = self.token(expr.operator)
+        if operator == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        if operator == TokenType.BANG_EQUAL:
+            return f"({left} != {right})"
+        a = self.temp()
+        if type(expr.right) == Literal and type(expr.right.value) is float and (operator not in (TokenType.SLASH, TokenType.MODULO) or expr.right.value != 0):
+            if operator == TokenType.PLUS:
+                return f"({a} + {right} if type({a} := {left}) is float else _addError({token}))"
+            return f"({a} {pythonOperators[operator]} {right} if type({a} := {left}) is float else _numberError({token}))"
+        b = self.temp()
+        numbers = f"(type({a} := {left}) is float) & (type({b} := {right}) is float)"
+        if operator == TokenType.PLUS:
+            return f"({a} + {b} if {numbers} or (type({a}) is str) & (type({b}) is str) else _addError({token}))"
+        if operator in (TokenType.SLASH, TokenType.MODULO):
+            return f"({a} {pythonOperators[operator]} {b} if {numbers} and {b} != 0 else _divideError({a}, {b}, {token}))"
+        return f"({a} {pythonOperators[operator]} {b} if {numbers} else _numberError({token}))"
+    def visitCallExpr(self, expr):
+        callee = self.expression(expr.callee)
+        arguments = [self.expression(argument) for argument in expr.arguments]
+        token = self.token(expr.paren)
+        function = self.temp()
+        if len(arguments) == 0:
+            return f"({function}.fn() if type({function} := {callee}) is _Fn and {function}.paramCount == 0 else _call({function}, {token}))"
+        values = [self.temp() for argument in arguments]
+        evaluate = ", ".join(f"({value} := {argument})" for value, argument in zip(values, arguments))
+        values = ", ".join(values)
+        return f"({function}.fn({values}) if (({function} := {callee}), {evaluate}) and type({function}) is _Fn and {function}.paramCount == {len(arguments)} else _call({function}, {token}, {values}))"
+    def visitGetExpr(self, expr):
+        return f"_get({self.expression(expr.object)}, {self.token(expr.name)})"
+    def visitGroupingExpr(self, expr):
+        return self.expression(expr.expression)
+    def visitLiteralExpr(self, expr):
+        if type(expr.value) is float and expr.value == float("inf"):
+            return "float('inf')"
+        return repr(expr.value)
+    def visitLogicalExpr(self, expr):
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        value = self.temp()
+        truthy = f"({value} := {left}) is not None and {value} != 0"
+        if expr.operator.type == TokenType.OR:
+            return f"({value} if {truthy} else {right})"
+        return f"({right} if {truthy} else {value})"
+    def visitSetExpr(self, expr):
+        token = self.token(expr.name)
+        return f"_set(_instance({self.expression(expr.object)}, {token}), {token}, {self.expression(expr.value)})"
+    def visitSuperExpr(self, expr):
+        info = self.bindings[expr]
+        superclass = f"{info.name}.v" if info.boxed else info.name
+        return f"_super({superclass}, this, {self.token(expr.method)})"
+    def visitThisExpr(self, expr):
+        return "this"
+    def visitUnaryExpr(self, expr):
+        right = self.expression(expr.right)
+        value = self.temp()
+        if expr.operator.type == TokenType.MINUS:
+            return f"(-{value} if type({value} := {right}) is float else _negateError({self.token(expr.operator)}))"
+        return f"(({value} := {right}) is None or {value} == 0)"
+    def visitVariableExpr(self, expr):
+        self.line = expr.name.line
+        info = self.bindings.get(expr)
+        if info == None:
+            return f"g_{expr.name.lexeme}"
+        if info.boxed:
+            return f"{info.name}.v"
+        return info.name
+
+comparisonOperators = [TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL, TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL]
+pythonOperators = {
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.SLASH: "/",
+    TokenType.MODULO: "%",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
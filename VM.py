@@ -0,0 +1,428 @@
+from Chunk import *
+from LoxRuntimeError import *
+from LoxClass import *
+from Interpreter import Clock, Input, Print, FRAMES_MAX
+
+
+class VMUpvalue:
+    def __init__(self, index):
+        self.index = index
+        self.value = None
+
+class VMClosure:
+    def __init__(self, function, upvalues):
+        self.function = function
+        self.upvalues = upvalues
+    def __repr__(self):
+        return repr(self.function)
+
+class VMBoundMethod:
+    def __init__(self, receiver, method):
+        self.receiver = receiver
+        self.method = method
+    def __repr__(self):
+        return repr(self.method)
+
+class VM:
+    def __init__(self, lox):
+        self.lox_class = lox
+        self.stack = []
+        self.frames = []
+        self.openUpvalues = {}
+        self.globals = {}
+        self.globals["clock"] = Clock()
+        self.globals["input"] = Input()
+        self.globals["print"] = Print()
+        self.stringify = lox.interpreter.stringify
+        self.maxFrames = FRAMES_MAX
+    def interpret(self, function):
+        closure = VMClosure(function, [])
+        self.stack.append(closure)
+        try:
+            self.run(closure)
+        except LoxRuntimeError as e:
+            self.lox_class.runtimeError(e)
+        finally:
+            self.stack.clear()
+            self.frames.clear()
+            self.openUpvalues.clear()
+    def captureUpvalue(self, index):
+        upvalue = self.openUpvalues.get(index)
+        if upvalue == None:
+            upvalue = VMUpvalue(index)
+            self.openUpvalues[index] = upvalue
+        return upvalue
+    def closeUpvalues(self, last):
+        stack = self.stack
+        for index in [index for index in self.openUpvalues if index >= last]:
+            upvalue = self.openUpvalues.pop(index)
+            upvalue.value = stack[index]
+            upvalue.index = -1
+    def run(self, closure):
+        stack = self.stack
+        frames = self.frames
+        openUpvalues = self.openUpvalues
+        globals = self.globals
+        maxFrames = self.maxFrames
+        push = stack.append
+        pop = stack.pop
+        isFloat = float
+        isStr = str
+        code = closure.function.chunk.code
+        constants = closure.function.chunk.constants
+        tokens = closure.function.chunk.tokens
+        base = 0
+        ip = 0
+        while True:
+            op = code[ip]
+            ip += 1
+            if op == OP_CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == OP_GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+            elif op == OP_POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value == 0:
+                    ip += code[ip]
+                else:
+                    ip += 1
+            elif op == OP_POP:
+                pop()
+            elif op == OP_ADD:
+                b = pop()
+                a = stack[-1]
+                if type(a) is isFloat and type(b) is isFloat:
+                    stack[-1] = a + b
+                elif type(a) is isStr and type(b) is isStr:
+                    stack[-1] = a + b
+                else:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be two numbers or two strigns.")
+            elif op == OP_LESS:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                stack[-1] = a < b
+            elif op == OP_SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif op == OP_LOOP:
+                ip -= code[ip]
+            elif op == OP_GET_GLOBAL:
+                name = constants[code[ip]]
+                try:
+                    push(globals[name])
+                except KeyError:
+                    raise LoxRuntimeError(tokens[ip], f"Undefined variable '{name}'.")
+                ip += 1
+            elif op == OP_EQUAL:
+                b = pop()
+                stack[-1] = stack[-1] == b
+            elif op == OP_MODULO:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                if b == 0:
+                    raise LoxRuntimeError(tokens[ip-1], "You can't divide by 0")
+                stack[-1] = a % b
+            elif op == OP_SUBTRACT:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                stack[-1] = a - b
+            elif op == OP_CALL:
+                argCount = code[ip]
+                ip += 1
+                callee = stack[-argCount-1]
+                if type(callee) is VMBoundMethod:
+                    stack[-argCount-1] = callee.receiver
+                    callee = callee.method
+                elif type(callee) is LoxClass:
+                    stack[-argCount-1] = LoxInstance(callee)
+                    callee = callee.findMethod("init")
+                    if callee == None:
+                        if argCount != 0:
+                            raise LoxRuntimeError(tokens[ip-1], f"Expected 0 arguments but got {argCount}.")
+                        continue
+                if type(callee) is VMClosure:
+                    function = callee.function
+                    if argCount != function.arity:
+                        raise LoxRuntimeError(tokens[ip-1], f"Expected {function.arity} arguments but got {argCount}.")
+                    if len(frames) >= maxFrames:
+                        raise LoxRuntimeError(tokens[ip-1], "Stack overflow.")
+                    frames.append((closure, ip, base))
+                    closure = callee
+                    code = function.chunk.code
+                    constants = function.chunk.constants
+                    tokens = function.chunk.tokens
+                    base = len(stack) - argCount - 1
+                    ip = 0
+                elif isinstance(callee, LoxCallable):
+                    if argCount != callee.arity:
+                        raise LoxRuntimeError(tokens[ip-1], f"Expected {callee.arity} arguments but got {argCount}.")
+                    arguments = stack[len(stack)-argCount:]
+                    del stack[len(stack)-argCount-1:]
+                    push(callee.call(self, arguments))
+                else:
+                    raise LoxRuntimeError(tokens[ip-1], "Can only call functions and classes.")
+            elif op == OP_RETURN:
+                result = pop()
+                if openUpvalues:
+                    self.closeUpvalues(base)
+                del stack[base:]
+                if not frames:
+                    return
+                push(result)
+                closure, ip, base = frames.pop()
+                code = closure.function.chunk.code
+                constants = closure.function.chunk.constants
+                tokens = closure.function.chunk.tokens
+            elif op == OP_TAIL_CALL:
+                argCount = code[ip]
+                ip += 1
+                callee = stack[-argCount-1]
+                if type(callee) is VMBoundMethod:
+                    stack[-argCount-1] = callee.receiver
+                    callee = callee.method
+                elif type(callee) is LoxClass:
+                    stack[-argCount-1] = LoxInstance(callee)
+                    callee = callee.findMethod("init")
+                    if callee == None:
+                        if argCount != 0:
+                            raise LoxRuntimeError(tokens[ip-1], f"Expected 0 arguments but got {argCount}.")
+                        continue
+                if type(callee) is VMClosure:
+                    function = callee.function
+                    if argCount != function.arity:
+                        raise LoxRuntimeError(tokens[ip-1], f"Expected {function.arity} arguments but got {argCount}.")
+                    if openUpvalues:
+                        self.closeUpvalues(base)
+                    stack[base:] = stack[len(stack)-argCount-1:]
+                    closure = callee
+                    code = function.chunk.code
+                    constants = function.chunk.constants
+                    tokens = function.chunk.tokens
+                    ip = 0
+                elif isinstance(callee, LoxCallable):
+                    if argCount != callee.arity:
+                        raise LoxRuntimeError(tokens[ip-1], f"Expected {callee.arity} arguments but got {argCount}.")
+                    arguments = stack[len(stack)-argCount:]
+                    del stack[len(stack)-argCount-1:]
+                    push(callee.call(self, arguments))
+                else:
+                    raise LoxRuntimeError(tokens[ip-1], "Can only call functions and classes.")
+            elif op == OP_JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value == 0:
+                    ip += code[ip]
+                else:
+                    ip += 1
+            elif op == OP_JUMP:
+                ip += code[ip]
+            elif op == OP_SET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in globals:
+                    raise LoxRuntimeError(tokens[ip], f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+                ip += 1
+            elif op == OP_GET_PROPERTY:
+                instance = stack[-1]
+                if type(instance) is not LoxInstance:
+                    raise LoxRuntimeError(tokens[ip], "Only instances have properties.")
+                name = constants[code[ip]]
+                ip += 1
+                slot = instance.shape.slots.get(name)
+                if slot != None:
+                    stack[-1] = instance.values[slot]
+                else:
+                    method = instance.klass.findMethod(name)
+                    if method == None:
+                        raise LoxRuntimeError(tokens[ip-1], f"Undefined property '{name}'.")
+                    stack[-1] = VMBoundMethod(instance, method)
+            elif op == OP_INVOKE:
+                name = constants[code[ip]]
+                argCount = code[ip+1]
+                ip += 2
+                receiver = stack[-argCount-1]
+                if type(receiver) is not LoxInstance:
+                    raise LoxRuntimeError(tokens[ip-1], "Only instances have properties.")
+                slot = receiver.shape.slots.get(name)
+                if slot != None:
+                    callee = receiver.values[slot]
+                    stack[-argCount-1] = callee
+                    if type(callee) is VMBoundMethod:
+                        stack[-argCount-1] = callee.receiver
+                        callee = callee.method
+                    elif type(callee) is LoxClass:
+                        stack[-argCount-1] = LoxInstance(callee)
+                        callee = callee.findMethod("init")
+                        if callee == None:
+                            if argCount != 0:
+                                raise LoxRuntimeError(tokens[ip-1], f"Expected 0 arguments but got {argCount}.")
+                            continue
+                    elif type(callee) is not VMClosure:
+                        if not isinstance(callee, LoxCallable):
+                            raise LoxRuntimeError(tokens[ip-1], "Can only call functions and classes.")
+                        if argCount != callee.arity:
+                            raise LoxRuntimeError(tokens[ip-1], f"Expected {callee.arity} arguments but got {argCount}.")
+                        arguments = stack[len(stack)-argCount:]
+                        del stack[len(stack)-argCount-1:]
+                        push(callee.call(self, arguments))
+                        continue
+                else:
+                    callee = receiver.klass.findMethod(name)
+                    if callee == None:
+                        raise LoxRuntimeError(tokens[ip-1], f"Undefined property '{name}'.")
+                function = callee.function
+                if argCount != function.arity:
+                    raise LoxRuntimeError(tokens[ip-1], f"Expected {function.arity} arguments but got {argCount}.")
+                if len(frames) >= maxFrames:
+                    raise LoxRuntimeError(tokens[ip-1], "Stack overflow.")
+                frames.append((closure, ip, base))
+                closure = callee
+                code = function.chunk.code
+                constants = function.chunk.constants
+                tokens = function.chunk.tokens
+                base = len(stack) - argCount - 1
+                ip = 0
+            elif op == OP_SET_PROPERTY:
+                value = pop()
+                instance = stack[-1]
+                if type(instance) is not LoxInstance:
+                    raise LoxRuntimeError(tokens[ip], "Only instances have fields.")
+                instance.setField(constants[code[ip]], value)
+                ip += 1
+                stack[-1] = value
+            elif op == OP_GET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                if upvalue.index >= 0:
+                    push(stack[upvalue.index])
+                else:
+                    push(upvalue.value)
+            elif op == OP_SET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                if upvalue.index >= 0:
+                    stack[upvalue.index] = stack[-1]
+                else:
+                    upvalue.value = stack[-1]
+            elif op == OP_MULTIPLY:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                stack[-1] = a * b
+            elif op == OP_LESS_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                stack[-1] = a <= b
+            elif op == OP_GREATER:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                stack[-1] = a > b
+            elif op == OP_GREATER_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                stack[-1] = a >= b
+            elif op == OP_NOT_EQUAL:
+                b = pop()
+                stack[-1] = stack[-1] != b
+            elif op == OP_DIVIDE:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not isFloat or type(b) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operands must be numbers.")
+                if b == 0:
+                    raise LoxRuntimeError(tokens[ip-1], "You can't divide by 0")
+                stack[-1] = a / b
+            elif op == OP_NIL:
+                push(None)
+            elif op == OP_TRUE:
+                push(True)
+            elif op == OP_FALSE:
+                push(False)
+            elif op == OP_JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value == 0:
+                    ip += 1
+                else:
+                    ip += code[ip]
+            elif op == OP_NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value == 0
+            elif op == OP_NEGATE:
+                if type(stack[-1]) is not isFloat:
+                    raise LoxRuntimeError(tokens[ip-1], "Operand should be a number.")
+                stack[-1] = -stack[-1]
+            elif op == OP_DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == OP_PRINT:
+                print(self.stringify(pop()))
+            elif op == OP_CLOSURE:
+                function = constants[code[ip]]
+                ip += 1
+                upvalues = []
+                for isLocal, index in function.upvalues:
+                    if isLocal:
+                        upvalues.append(self.captureUpvalue(base + index))
+                    else:
+                        upvalues.append(closure.upvalues[index])
+                push(VMClosure(function, upvalues))
+            elif op == OP_CLOSE_UPVALUE:
+                self.closeUpvalues(len(stack) - 1)
+                pop()
+            elif op == OP_GET_SUPER:
+                name = constants[code[ip]]
+                ip += 1
+                superclass = pop()
+                method = superclass.findMethod(name)
+                if method == None:
+                    raise LoxRuntimeError(tokens[ip-1], f"Undefined property '{name}'.")
+                stack[-1] = VMBoundMethod(stack[-1], method)
+            elif op == OP_SUPER_INVOKE:
+                name = constants[code[ip]]
+                argCount = code[ip+1]
+                ip += 2
+                superclass = pop()
+                callee = superclass.findMethod(name)
+                if callee == None:
+                    raise LoxRuntimeError(tokens[ip-1], f"Undefined property '{name}'.")
+                function = callee.function
+                if argCount != function.arity:
+                    raise LoxRuntimeError(tokens[ip-1], f"Expected {function.arity} arguments but got {argCount}.")
+                if len(frames) >= maxFrames:
+                    raise LoxRuntimeError(tokens[ip-1], "Stack overflow.")
+                frames.append((closure, ip, base))
+                closure = callee
+                code = function.chunk.code
+                constants = function.chunk.constants
+                tokens = function.chunk.tokens
+                base = len(stack) - argCount - 1
+                ip = 0
+            elif op == OP_CLASS:
+                push(LoxClass(constants[code[ip]], None, {}))
+                ip += 1
+            elif op == OP_INHERIT:
+                superclass = stack[-2]
+                if type(superclass) is not LoxClass:
+                    raise LoxRuntimeError(tokens[ip-1], "Superclass must be a class.")
+                stack[-1].inherit(superclass)
+                pop()
+            elif op == OP_METHOD:
+                method = pop()
+                name = constants[code[ip]]
+                stack[-1].methods[name] = method
+                if name == "init": stack[-1].arity = method.function.arity
+                ip += 1
@@ -0,0 +1,46 @@
+import gc
+import os
+import resource
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scanner import Scanner
+from parser import Parser
+
+class Reporter:
+    def error(self, line, message):
+        print(f"[line {line}] Error: {message}")
+    def parseError(self, token, message):
+        print(f"[line {token.line}] Error at '{token.lexeme}': {message}")
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    directory = os.path.dirname(os.path.abspath(__file__))
+    sample = ""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".lox"):
+            with open(os.path.join(directory, name)) as file:
+                sample += file.read() + "\n"
+    source = sample * max(1, int(megabytes * 1024 * 1024 / len(sample)))
+    size = len(source.encode()) / (1024 * 1024)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    tokens = Scanner(source, Reporter()).scanTokens()
+    statements = Parser(tokens, Reporter()).parse()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    blocks = sys.getallocatedblocks() - blocks
+    modules = {"Token", "Expr", "Stmt"}
+    counts = Counter(type(value).__name__ for value in gc.get_objects() if type(value).__module__ in modules)
+    print(f"{size:.2f} MB, {len(tokens)} tokens, {len(statements)} statements, scan+parse {elapsed:.3f}s")
+    print(f"peak RSS {peak / 1024:.1f} MB (+{(peak - before) / 1024:.1f} MB for tokens and AST)")
+    print(f"live tokens and nodes: {sum(counts.values())}, allocated blocks: {blocks} ({blocks / len(tokens):.2f} per token)")
+    print(f"sizes: token {objectSize(tokens[0])} bytes, node {objectSize(statements[0])} bytes")
+
+def objectSize(value):
+    return sys.getsizeof(value) + (sys.getsizeof(value.__dict__) if hasattr(value, "__dict__") else 0)
+
+main()
@@ -0,0 +1,102 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+LOX = os.path.join(os.path.dirname(DIRECTORY), "Lox.py")
+
+def main():
+    runs = 5
+    threshold = 10.0
+    baseline = None
+    save = None
+    names = []
+    cache = False
+    loxFlags = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--runs=") and arg[7:].isdigit() and int(arg[7:]) > 0:
+            runs = int(arg[7:])
+        elif arg.startswith("--threshold="):
+            threshold = float(arg[12:])
+        elif arg.startswith("--baseline="):
+            baseline = arg[11:]
+        elif arg.startswith("--save="):
+            save = arg[7:]
+        elif arg == "--cache":
+            cache = True
+        elif arg.startswith("--"):
+            loxFlags.append(arg)
+        else:
+            names.append(arg)
+    if not cache:
+        loxFlags.insert(0, "--no-cache")
+    if len(names) == 0:
+        names = sorted(name[:-4] for name in os.listdir(DIRECTORY) if name.endswith(".lox"))
+    results = {
+        "python": platform.python_version(),
+        "runs": runs,
+        "flags": loxFlags,
+        "benchmarks": {},
+    }
+    for name in names:
+        print(f"{name}...", end="", file=sys.stderr, flush=True)
+        results["benchmarks"][name] = measure(name, runs, loxFlags)
+        print(f" {results['benchmarks'][name]['median']:.3f}s", file=sys.stderr)
+    output = json.dumps(results, indent=2)
+    if save != None:
+        with open(save, "w") as file:
+            file.write(output + "\n")
+    print(output)
+    if baseline != None:
+        with open(baseline) as file:
+            regressions = compare(json.load(file), results, threshold)
+        if len(regressions) > 0:
+            print(f"{len(regressions)} regression(s) past {threshold:g}%: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+def measure(name, runs, loxFlags):
+    times = []
+    memory = []
+    for i in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, LOX] + loxFlags + [os.path.join(DIRECTORY, name + ".lox")], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        errors = process.stderr.read()
+        _, status, usage = os.wait4(process.pid, 0)
+        times.append(time.perf_counter() - start)
+        process.stderr.close()
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            sys.stderr.write(errors.decode())
+            sys.exit(f"{name} exited with status {process.returncode}")
+        memory.append(usage.ru_maxrss)
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "peakMemoryKb": max(memory),
+        "times": times,
+    }
+
+def compare(baseline, results, threshold):
+    if baseline.get("flags") != results["flags"]:
+        print(f"warning: baseline was measured with {baseline.get('flags')}, not {results['flags']}", file=sys.stderr)
+    print(f"{'benchmark':<16} {'baseline':>9} {'median':>9} {'change':>8} {'memory':>8}", file=sys.stderr)
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        old = baseline["benchmarks"].get(name)
+        if old == None:
+            print(f"{name:<16} {'-':>9} {result['median']:>8.3f}s", file=sys.stderr)
+            continue
+        change = (result["median"] / old["median"] - 1) * 100
+        memoryChange = (result["peakMemoryKb"] / old["peakMemoryKb"] - 1) * 100
+        flag = ""
+        if change > threshold or memoryChange > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<16} {old['median']:>8.3f}s {result['median']:>8.3f}s {change:>+7.1f}% {memoryChange:>+7.1f}%{flag}", file=sys.stderr)
+    return regressions
+
+main()
@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scanner import Scanner
+
+class Reporter:
+    def error(self, line, message):
+        print(f"[line {line}] Error: {message}")
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    directory = os.path.dirname(os.path.abspath(__file__))
+    sample = ""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".lox"):
+            with open(os.path.join(directory, name)) as file:
+                sample += file.read() + "\n"
+    source = sample * max(1, int(megabytes * 1024 * 1024 / len(sample)))
+    size = len(source.encode()) / (1024 * 1024)
+    best = None
+    for i in range(3):
+        start = time.perf_counter()
+        tokens = Scanner(source, Reporter()).scanTokens()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best: best = elapsed
+    print(f"{size:.2f} MB, {len(tokens)} tokens, best of 3: {best:.3f}s, {size / best:.2f} MB/s")
+
+main()
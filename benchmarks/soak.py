@@ -0,0 +1,74 @@
+import gc
+import os
+import resource
+import sys
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORY))
+
+from Lox import Lox
+from TieredInterpreter import TieredInterpreter
+
+SOURCE = """
+class Counter {
+  init(start) { this.count = start; }
+  step(by) { this.count = this.count + by; return this.count; }
+}
+fun makeAdder(n) {
+  fun add(x) { return x + n; }
+  return add;
+}
+var counter = Counter(0);
+var add = makeAdder(2);
+for (var i = 0; i < 3; i = i + 1) {
+  var doubled = i * 2;
+  { var unused = doubled; }
+  counter.step(add(doubled));
+}
+print counter.count;
+"""
+
+def main():
+    runs = 100000
+    every = 10000
+    threshold = 10.0
+    backend = "interpreter"
+    for arg in sys.argv[1:]:
+        if arg.startswith("--runs=") and arg[7:].isdigit() and int(arg[7:]) > 0:
+            runs = int(arg[7:])
+        elif arg.startswith("--every=") and arg[8:].isdigit() and int(arg[8:]) > 0:
+            every = int(arg[8:])
+        elif arg.startswith("--threshold="):
+            threshold = float(arg[12:])
+        elif arg in ["--backend=interpreter", "--backend=closure", "--backend=vm", "--backend=tiered"]:
+            backend = arg.split("=")[1]
+        else:
+            sys.exit("Usage: python3 benchmarks/soak.py [--runs=N] [--every=N] [--threshold=PCT] [--backend=interpreter|closure|vm|tiered]")
+    lox = Lox()
+    lox.backend = backend
+    if backend == "tiered":
+        lox.interpreter = TieredInterpreter(lox)
+    stdout = sys.stdout
+    samples = []
+    with open(os.devnull, "w") as devnull:
+        for i in range(1, runs + 1):
+            sys.stdout = devnull
+            try:
+                lox.run(SOURCE)
+            finally:
+                sys.stdout = stdout
+            if lox.hadError or lox.hadRuntimeError:
+                sys.exit(f"run {i} failed")
+            if i % every == 0 or i == runs:
+                gc.collect()
+                samples.append((i, len(gc.get_objects()), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+                print(f"{i:>8} runs {samples[-1][1]:>10} objects {samples[-1][2]:>10} KB peak", file=sys.stderr)
+    first, last = samples[0], samples[-1]
+    objectGrowth = (last[1] / first[1] - 1) * 100
+    memoryGrowth = (last[2] / first[2] - 1) * 100
+    print(f"growth after run {first[0]}: {objectGrowth:+.1f}% objects, {memoryGrowth:+.1f}% peak memory", file=sys.stderr)
+    if objectGrowth > threshold or memoryGrowth > threshold:
+        print(f"memory grew past {threshold:g}%", file=sys.stderr)
+        sys.exit(1)
+
+main()
@@ -1,89 +1,92 @@
 from Expr import *
 from Stmt import *
+from TokenType import *
 
 class Parser:
     def __init__(self, tokens, lox):
-        self.tokens = tokens
-        self.current = 0
+        self.tokens = iter(tokens)
+        self.currentToken = None
+        self.previousToken = None
         self.lox_class = lox
     def parse(self):
-        statements = []
+        return list(self.declarations())
+    def declarations(self):
         while not self.isAtEnd():
-            statements.append(self.declaration())
-        return statements
+            yield self.declaration()
     def declaration(self):
         try:
-            if self.match("VAR"): return self.varDeclaration()
-            elif self.match("FUN"): return self.function("function")
-            elif self.match("CLASS"): return self.classDeclaration()
+            if self.match(TokenType.VAR): return self.varDeclaration()
+            elif self.match(TokenType.FUN): return self.function("function")
+            elif self.match(TokenType.CLASS): return self.classDeclaration()
             return self.statement()
         except ParseError:
             self.synchronise()
             return None
     def varDeclaration(self):
-        name = self.consume("IDENTIFIER", "Expect variable name.")
+        name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
         initialiser = None
-        if self.match("EQUAL"):
+        if self.match(TokenType.EQUAL):
             initialiser = self.expression()
-        self.consume("SEMICOLON", "Expect ';' after variable declaration.")
+        self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
         return Var(name, initialiser)
     def classDeclaration(self):
-        name = self.consume("IDENTIFIER", "Expect class name.")
+        name = self.consume(TokenType.IDENTIFIER, "Expect class name.")
         superclass = None
-        if self.match("LESS"):
-            self.consume("IDENTIFIER", "Expect superclass name.")
+        if self.match(TokenType.LESS):
+            self.consume(TokenType.IDENTIFIER, "Expect superclass name.")
             superclass = Variable(self.previous())
-        self.consume("LEFT_BRACE", "Expect '{' before class body")
+        self.consume(TokenType.LEFT_BRACE, "Expect '{' before class body")
         methods = []
-        while not(self.check("RIGHT_BRACE")) and not(self.isAtEnd()):
+        while not(self.check(TokenType.RIGHT_BRACE)) and not(self.isAtEnd()):
             methods.append(self.function("method"))
-        self.consume("RIGHT_BRACE", "Expect '}' after class body")
+        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after class body")
         return Class(name, superclass, methods)
     def statement(self):
-        if self.match("PRINT"): return self.printStatement()
-        elif self.match("IF"): return self.ifStatement()
-        elif self.match("WHILE"): return self.whileStatement()
-        elif self.match("FOR"): return self.forStatement()
-        elif self.match("LEFT_BRACE"): return Block(self.block())
-        elif self.match("RETURN"): return self.returnStatement()
+        if self.match(TokenType.PRINT): return self.printStatement()
+        elif self.match(TokenType.IF): return self.ifStatement()
+        elif self.match(TokenType.WHILE): return self.whileStatement()
+        elif self.match(TokenType.FOR): return self.forStatement()
+        elif self.match(TokenType.LEFT_BRACE): return Block(self.block())
+        elif self.match(TokenType.RETURN): return self.returnStatement()
         return self.expressionStatement()
     def printStatement(self):
+        keyword = self.previous()
         value = self.expression()
-        self.consume("SEMICOLON", "Expect ';' after value.")
-        return Print(value)
+        self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        return Print(keyword, value)
     def ifStatement(self):
-        self.consume("LEFT_PAREN", "Expect '(' after 'if'.")
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
         condition = self.expression()
-        self.consume("RIGHT_PAREN", "Expect ')' after if condition.")
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
         thenBranch = self.statement()
         elseBranch = None
-        if self.match("ELSE"):
+        if self.match(TokenType.ELSE):
             elseBranch = self.statement()
         return If(condition, thenBranch, elseBranch)
     def whileStatement(self):
-        self.consume("LEFT_PAREN", "Expect '(' after 'while'.")
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         condition = self.expression()
-        self.consume("RIGHT_PAREN", "Expect ')' after while condition.")
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after while condition.")
         body = self.statement()
         return While(condition, body)
     def forStatement(self):
-        self.consume("LEFT_PAREN", "Expect '(' after 'for'.")
-        if self.match("SEMICOLON"):
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
+        if self.match(TokenType.SEMICOLON):
             initialiser = None
-        elif self.match("VAR"):
+        elif self.match(TokenType.VAR):
             initialiser = self.varDeclaration()
         else:
             initialiser = self.expressionStatement()
-        if not self.check("SEMICOLON"):
+        if not self.check(TokenType.SEMICOLON):
             condition = self.expression()
         else:
             condition = None
-        self.consume("SEMICOLON", "Expect ';' after loop condition.")
-        if not self.check("RIGHT_PAREN"):
+        self.consume(TokenType.SEMICOLON, "Expect ';' after loop condition.")
+        if not self.check(TokenType.RIGHT_PAREN):
             increment = self.expression()
         else:
             increment = None
-        self.consume("RIGHT_PAREN", "Expect ')' after for clauses.")
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
         body = self.statement()
         if increment != None:
             body = Block([body, Expression(increment)])
@@ -95,39 +98,39 @@ class Parser:
     def returnStatement(self):
         keyword = self.previous()
         value = None
-        if not self.check("SEMICOLON"):
+        if not self.check(TokenType.SEMICOLON):
             value = self.expression()
-        self.consume("SEMICOLON", "Expect ';' after return value.")
+        self.consume(TokenType.SEMICOLON, "Expect ';' after return value.")
         return Return(keyword, value)
     def expressionStatement(self):
         expr = self.expression()
-        self.consume("SEMICOLON", "Expect ';' after value.")
+        self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
         return Expression(expr)
     def function(self, kind):
-        name = self.consume("IDENTIFIER", f"Expect {kind} name.")
-        self.consume("LEFT_PAREN", f"Expect '(' after {kind} name.")
+        name = self.consume(TokenType.IDENTIFIER, f"Expect {kind} name.")
+        self.consume(TokenType.LEFT_PAREN, f"Expect '(' after {kind} name.")
         parameters = []
-        if not self.check("RIGHT_PAREN"):
-            parameters.append(self.consume("IDENTIFIER", "Expect paramter name."))
-            while self.match("COMMA"):
+        if not self.check(TokenType.RIGHT_PAREN):
+            parameters.append(self.consume(TokenType.IDENTIFIER, "Expect paramter name."))
+            while self.match(TokenType.COMMA):
                 if len(parameters) >= 255:
                     self.error(self.peek(), "Can't have more than 255 paramaters.")
-                parameters.append(self.consume("IDENTIFIER", "Expect paramter name."))
-        self.consume("RIGHT_PAREN", "Expect ')' after parameters.")
-        self.consume("LEFT_BRACE", "Expect '{' before " + kind + " body.")
+                parameters.append(self.consume(TokenType.IDENTIFIER, "Expect paramter name."))
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
+        self.consume(TokenType.LEFT_BRACE, "Expect '{' before " + kind + " body.")
         body = self.block()
         return Function(name, parameters, body)
     def block(self):
         statements = []
-        while (not self.check("RIGHT_BRACE")) and (not self.isAtEnd()):
+        while (not self.check(TokenType.RIGHT_BRACE)) and (not self.isAtEnd()):
             statements.append(self.declaration())
-        self.consume("RIGHT_BRACE", "Expect '}' after block.")
+        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
         return statements
     def assignment(self):
         expr = self.logicalOr()
         #print(expr)
         #print(self.peek())
-        if self.match("EQUAL"):
+        if self.match(TokenType.EQUAL):
             equals = self.previous()
             value = self.assignment()
             if type(expr) == Variable:
@@ -140,14 +143,14 @@ class Parser:
         return expr
     def logicalOr(self):
         expr = self.logicalAnd()
-        while self.match("OR"):
+        while self.match(TokenType.OR):
             operator = self.previous()
             right = self.logicalAnd()
             expr = Logical(expr, operator, right)
         return expr
     def logicalAnd(self):
         expr = self.equality()
-        while self.match("AND"):
+        while self.match(TokenType.AND):
             operator = self.previous()
             right = self.equality()
             expr = Logical(expr, operator, right)
@@ -156,41 +159,41 @@ class Parser:
         return self.assignment()
     def equality(self):
         expr = self.comparison()
-        while self.match("BANG_EQUAL", "EQUAL_EQUAL"):
+        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
             operator = self.previous()
             right = self.comparison()
             expr = Binary(expr, operator, right)
         return expr
     def comparison(self):
         expr = self.mod()
-        while self.match("GREATER", "GREATER_EQUAL", "LESS", "LESS_EQUAL"):
+        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
             operator = self.previous()
             right = self.mod()
             expr = Binary(expr, operator, right)
         return expr
     def mod(self):
         expr = self.term()
-        while self.match("MODULO"):
+        while self.match(TokenType.MODULO):
             operator = self.previous()
             right = self.term()
             expr = Binary(expr, operator, right)
         return expr
     def term(self):
         expr = self.factor()
-        while self.match("MINUS", "PLUS"):
+        while self.match(TokenType.MINUS, TokenType.PLUS):
             operator = self.previous()
             right = self.factor()
             expr = Binary(expr, operator, right)
         return expr
     def factor(self):
         expr = self.unary()
-        while self.match("STAR", "SLASH"):
+        while self.match(TokenType.STAR, TokenType.SLASH):
             operator = self.previous()
             right = self.unary()
             expr = Binary(expr, operator, right)
         return expr
     def unary(self):
-        if self.match("BANG", "MINUS"):
+        if self.match(TokenType.BANG, TokenType.MINUS):
             operator = self.previous()
             right = self.unary()
             return Unary(operator, right)
@@ -198,62 +201,69 @@ class Parser:
     def call(self):
         expr = self.primary()
         while True:
-            if self.match("LEFT_PAREN"):
+            if self.match(TokenType.LEFT_PAREN):
                 expr = self.finishCall(expr)
-            elif self.match("DOT"):
-                name = self.consume("IDENTIFIER", "Expect property name after '.'.")
+            elif self.match(TokenType.DOT):
+                name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
                 expr = Get(expr, name)
             else:
                 break
         return expr
     def primary(self):
-        if self.match("TRUE"): return Literal(True)
-        elif self.match("FALSE"): return Literal(False)
-        elif self.match("NIL"): return Literal(None)
-        elif self.match("NUMBER", "STRING"):
+        if self.match(TokenType.TRUE): return Literal(True)
+        elif self.match(TokenType.FALSE): return Literal(False)
+        elif self.match(TokenType.NIL): return Literal(None)
+        elif self.match(TokenType.NUMBER, TokenType.STRING):
             return Literal(self.previous().literal)
-        elif self.match("SUPER"):
+        elif self.match(TokenType.SUPER):
             keyword = self.previous()
-            self.consume("DOT", "Expect '.' after 'super'.")
-            method = self.consume("IDENTIFIER", "Expect superclass method name.")
+            self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+            method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
             return Super(keyword, method)
-        elif self.match("THIS"):
+        elif self.match(TokenType.THIS):
             return This(self.previous())
-        elif self.match("IDENTIFIER"):
+        elif self.match(TokenType.IDENTIFIER):
             return Variable(self.previous())
-        elif self.match("LEFT_PAREN"):
+        elif self.match(TokenType.LEFT_PAREN):
             expr = self.expression()
-            self.consume("RIGHT_PAREN", "Expect ')' after expression.")
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
             return Grouping(expr)
         raise self.error(self.peek(), "Expect expression.")
     def finishCall(self, callee):
         arguments = []
-        if not self.check("RIGHT_PAREN"):
+        if not self.check(TokenType.RIGHT_PAREN):
             arguments.append(self.expression())
-            while self.match("COMMA"):
+            while self.match(TokenType.COMMA):
                 if len(arguments) >= 255:
                     self.error(self.peek(), "Can't have more than 255 arguments.")
                 arguments.append(self.expression())
-        paren = self.consume("RIGHT_PAREN", "Expect ')' after arguments")
+        paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments")
         return Call(callee, paren, arguments)
     def match(self, *args):
-        for type in args:
-            if self.check(type):
-                self.advance()
-                return True
+        token = self.currentToken
+        if token is None: token = self.peek()
+        if token.type in args:
+            self.previousToken = token
+            self.currentToken = None
+            return True
         return False
     def check(self, type):
-        if self.isAtEnd(): return False
-        return self.peek().type == type
+        token = self.currentToken
+        if token is None: token = self.peek()
+        return token.type == type
     def isAtEnd(self):
-        return self.peek().type == "EOF"
+        return self.peek().type == TokenType.EOF
     def peek(self):
-        return self.tokens[self.current]
+        if self.currentToken is None:
+            self.currentToken = next(self.tokens)
+        return self.currentToken
     def advance(self):
-        if not self.isAtEnd(): self.current += 1
-        return self.previous()
+        if not self.isAtEnd():
+            self.previousToken = self.currentToken
+            self.currentToken = None
+        return self.previousToken
     def previous(self):
-        return self.tokens[self.current-1]
+        return self.previousToken
     def consume(self, token, message):
         if self.check(token): return self.advance()
         self.error(self.peek(), message)
@@ -264,9 +274,9 @@ class Parser:
     def synchronise(self):
         self.advance()
         while not self.isAtEnd():
-            if self.previous().type == "SEMICOLON": return
+            if self.previous().type == TokenType.SEMICOLON: return
             nextType = self.peek().type
-            if nextType in ["CLASS", "FUN", "VAR", "FOR", "IF", "WHILE", "PRINT", "RETURN"]:
+            if nextType in [TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF, TokenType.WHILE, TokenType.PRINT, TokenType.RETURN]:
                 return
             self.advance()
 class ParseError(RuntimeError):
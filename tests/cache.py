@@ -0,0 +1,53 @@
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+LOX = os.path.join(os.path.dirname(DIRECTORY), "Lox.py")
+SOURCE = """var price = 12.5;
+print price * 2;
+var name = "widget";
+print name;
+"""
+EXPECTED = "25\nwidget\n"
+CORRUPTIONS = [
+    ("float literal", struct.pack("<d", 12.5), struct.pack("<d", 12.0)),
+    ("string literal", b"widget", b"whdget"),
+]
+
+def run(path):
+    process = subprocess.run([sys.executable, LOX, path], capture_output=True, text=True)
+    return process.stdout, process.stderr, process.returncode
+
+def main():
+    failures = 0
+    for name, original, corrupt in CORRUPTIONS:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "script.lox")
+            cachePath = os.path.join(directory, "__loxcache__", "script.loxc")
+            with open(path, "w") as file:
+                file.write(SOURCE)
+            run(path)
+            with open(cachePath, "rb") as file:
+                data = file.read()
+            if data.count(original) != 1:
+                failures += 1
+                print(f"FAIL {name}: literal not found once in the cache entry", file=sys.stderr)
+                continue
+            with open(cachePath, "wb") as file:
+                file.write(data.replace(original, corrupt))
+            output = run(path)
+            with open(cachePath, "rb") as file:
+                rewritten = file.read()
+            if output != (EXPECTED, "", 0):
+                failures += 1
+                print(f"FAIL {name}: got {output}", file=sys.stderr)
+            if corrupt in rewritten or original not in rewritten:
+                failures += 1
+                print(f"FAIL {name}: corrupt cache entry was not rewritten", file=sys.stderr)
+    print(f"{len(CORRUPTIONS)} corruptions, {failures} failed", file=sys.stderr)
+    if failures > 0: sys.exit(1)
+
+main()
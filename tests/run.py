@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+LOX = os.path.join(os.path.dirname(DIRECTORY), "Lox.py")
+CONFIGURATIONS = [
+    [],
+    ["--no-optimize"],
+    ["--backend=vm"],
+    ["--backend=closure"],
+    ["--backend=python"],
+    ["--backend=tiered"],
+]
+EXPECT = "// expect: "
+
+def main():
+    names = sys.argv[1:]
+    if len(names) == 0:
+        names = sorted(name[:-4] for name in os.listdir(DIRECTORY) if name.endswith(".lox"))
+    failures = 0
+    for name in names:
+        path = os.path.join(DIRECTORY, name + ".lox")
+        with open(path) as file:
+            expected = [line.split(EXPECT, 1)[1].rstrip("\n") for line in file if EXPECT in line]
+        for flags in CONFIGURATIONS:
+            process = subprocess.run([sys.executable, LOX, "--no-cache"] + flags + [path], capture_output=True, text=True)
+            output = process.stdout.splitlines()
+            if output != expected or process.stderr != "":
+                failures += 1
+                print(f"FAIL {name} {' '.join(flags)}", file=sys.stderr)
+                print(f"  expected: {expected}", file=sys.stderr)
+                print(f"  got:      {output}", file=sys.stderr)
+                if process.stderr != "":
+                    print(process.stderr, file=sys.stderr)
+    print(f"{len(names)} scripts, {len(names) * len(CONFIGURATIONS)} runs, {failures} failed", file=sys.stderr)
+    if failures > 0: sys.exit(1)
+
+main()